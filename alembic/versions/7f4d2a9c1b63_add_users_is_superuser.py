@@ -0,0 +1,29 @@
+"""add users is_superuser
+
+Revision ID: 7f4d2a9c1b63
+Revises: e5b2c9d47a18
+Create Date: 2026-10-18 16:42:15.806331
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7f4d2a9c1b63"
+down_revision = "e5b2c9d47a18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A constant default only touches the catalog, existing rows aren't rewritten.
+    op.add_column(
+        "users",
+        sa.Column("is_superuser", sa.Boolean(), server_default=sa.text("false"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "is_superuser")
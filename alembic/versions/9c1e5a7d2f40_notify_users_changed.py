@@ -0,0 +1,55 @@
+"""notify users changed
+
+Revision ID: 9c1e5a7d2f40
+Revises: 4b63ef282f36
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "9c1e5a7d2f40"
+down_revision = "4b63ef282f36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Row changes are published on the `users_changed` channel,
+    # so every API worker can drop its cached copy of the user (see src/repositories/cache.py).
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_users_changed() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('users_changed', json_build_object(
+                    'id', OLD.id,
+                    'emails', json_build_array(OLD.email),
+                    'ts', extract(epoch FROM clock_timestamp())
+                )::text);
+            ELSE
+                PERFORM pg_notify('users_changed', json_build_object(
+                    'id', NEW.id,
+                    'emails', json_build_array(OLD.email, NEW.email),
+                    'ts', extract(epoch FROM clock_timestamp())
+                )::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_changed_notify
+        AFTER UPDATE OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION notify_users_changed();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS users_changed_notify ON users;")
+    op.execute("DROP FUNCTION IF EXISTS notify_users_changed();")
@@ -0,0 +1,51 @@
+"""add users token_version
+
+Revision ID: b8e3f1c6d29a
+Revises: 7f4d2a9c1b63
+Create Date: 2026-10-18 19:05:47.219384
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b8e3f1c6d29a"
+down_revision = "7f4d2a9c1b63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A constant default only touches the catalog, existing rows aren't rewritten.
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    # Deactivation revokes the issued tokens however the row is updated, by the API or by hand.
+    # Anything else can revoke them with `UPDATE users SET token_version = token_version + 1`.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION revoke_users_tokens() RETURNS trigger AS $$
+        BEGIN
+            NEW.token_version := OLD.token_version + 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_deactivated_revoke_tokens
+        BEFORE UPDATE OF is_active ON users
+        FOR EACH ROW WHEN (OLD.is_active AND NOT NEW.is_active)
+        EXECUTE FUNCTION revoke_users_tokens();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS users_deactivated_revoke_tokens ON users;")
+    op.execute("DROP FUNCTION IF EXISTS revoke_users_tokens();")
+    op.drop_column("users", "token_version")
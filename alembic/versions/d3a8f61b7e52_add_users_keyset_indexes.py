@@ -0,0 +1,41 @@
+"""add users keyset indexes
+
+Revision ID: d3a8f61b7e52
+Revises: 9c1e5a7d2f40
+Create Date: 2026-10-18 11:03:47.218845
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "d3a8f61b7e52"
+down_revision = "9c1e5a7d2f40"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction, and keeps the users table writable during the build.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_created_at_id",
+            "users",
+            ["created_at", "id"],
+            postgresql_include=["email", "first_name", "last_name", "is_active"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_is_active_created_at_id",
+            "users",
+            ["is_active", "created_at", "id"],
+            postgresql_include=["email", "first_name", "last_name"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_users_is_active_created_at_id", table_name="users", postgresql_concurrently=True)
+        op.drop_index("ix_users_created_at_id", table_name="users", postgresql_concurrently=True)
@@ -0,0 +1,36 @@
+"""create rate limit counters table
+
+Revision ID: e5b2c9d47a18
+Revises: d3a8f61b7e52
+Create Date: 2026-10-18 14:26:09.537204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e5b2c9d47a18"
+down_revision = "d3a8f61b7e52"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # UNLOGGED: counters are short-lived and may be lost on a crash, so skip the WAL.
+    op.create_table(
+        "rate_limit_counters",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("window_start", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("key", "window_start"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index("ix_rate_limit_counters_expires_at", "rate_limit_counters", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rate_limit_counters_expires_at", table_name="rate_limit_counters")
+    op.drop_table("rate_limit_counters")
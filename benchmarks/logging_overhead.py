@@ -0,0 +1,102 @@
+"""
+Measure the time a request spends in logging calls with the old synchronous handler and the queue-based one.
+
+Every simulated request logs one app line and one access line, the sink can be slowed down to mimic a blocked stdout:
+
+    python -m benchmarks.logging_overhead --requests 20000 --sink-delay 0.0002
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import time
+from typing import TextIO
+
+from src.utils.logging import BoundedQueueHandler, JsonFormatter, SamplingFilter, TraceIdFilter
+
+
+OLD_JSON_FORMAT = (
+    '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "body": "%(message)s", '
+    '"log.logger": "%(name)s", "metadata": {"process": "%(process)d", "path": "%(pathname)s", '
+    '"trace_id": "%(trace_id)s"}}'
+)
+
+
+class SlowStream:
+    """File wrapper whose writes take at least `delay` seconds, like a terminal or pipe that can't keep up."""
+
+    def __init__(self, stream: TextIO, delay: float) -> None:
+        self._stream = stream
+        self._delay = delay
+
+    def write(self, data: str) -> int:
+        if self._delay:
+            time.sleep(self._delay)
+        return self._stream.write(data)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+def build_loggers(name: str, handler: logging.Handler, sample_rate: float) -> tuple[logging.Logger, logging.Logger]:
+    handler.addFilter(TraceIdFilter())
+
+    app_logger = logging.getLogger(f"bench.{name}.app")
+    access_logger = logging.getLogger(f"bench.{name}.access")
+    for logger in (app_logger, access_logger):
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    if sample_rate < 1:
+        access_logger.addFilter(SamplingFilter(rate=sample_rate))
+    return app_logger, access_logger
+
+
+def run(name: str, handler: logging.Handler, requests: int, sample_rate: float) -> None:
+    app_logger, access_logger = build_loggers(name, handler, sample_rate)
+
+    latencies = []
+    for i in range(requests):
+        started = time.perf_counter()
+        app_logger.info('Loaded user %s with "email" %s', i, f"user{i}@example.com")
+        access_logger.info('%s - "%s %s HTTP/%s" %d', "10.0.0.1:5123", "GET", "/api/v1/users/me", "1.1", 200)
+        latencies.append(time.perf_counter() - started)
+
+    flush_started = time.perf_counter()
+    handler.close()
+    flush_time = time.perf_counter() - flush_started
+
+    latencies.sort()
+    dropped = getattr(handler, "dropped", 0)
+    print(
+        f"{name:<8} per-request p50={statistics.median(latencies) * 1e6:>8.1f}us "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1e6:>8.1f}us "
+        f"total={sum(latencies):>7.3f}s drain={flush_time:>7.3f}s dropped={dropped}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--output", default=os.devnull)
+    parser.add_argument("--sink-delay", type=float, default=0.0, help="Seconds every write to the sink takes.")
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    parser.add_argument("--policy", choices=["drop", "block"], default="drop")
+    parser.add_argument("--access-sample-rate", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with open(args.output, "w") as output:
+        stream = SlowStream(output, args.sink_delay)
+
+        before = logging.StreamHandler(stream)  # type: ignore[arg-type]
+        before.setFormatter(logging.Formatter(OLD_JSON_FORMAT))
+        run("before", before, args.requests, sample_rate=1.0)
+
+        after = BoundedQueueHandler(stream, max_size=args.queue_size, policy=args.policy)  # type: ignore[arg-type]
+        after.setFormatter(JsonFormatter())
+        run("after", after, args.requests, sample_rate=args.access_sample_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare query throughput of a direct Postgres connection and a PgBouncer-pooled one.
+
+Credentials and the database name come from the usual DB_* settings, only the address and pooler mode differ:
+
+    python -m benchmarks.pooler_throughput --pooled-host pgbouncer --pooled-port 6432 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from src.config.config import DatabaseSettings
+from src.config.database import Database
+
+
+QUERY = text("SELECT id, email, is_active FROM users WHERE id = :id")
+
+
+async def run_worker(database: Database, deadline: float, max_id: int, latencies: list[float]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        async with database.get_connection() as conn:
+            await conn.execute(QUERY, {"id": random.randint(1, max_id)})
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_benchmark(name: str, db_settings: DatabaseSettings, concurrency: int, duration: float, max_id: int):
+    database = Database(db_settings)
+    await database.start()
+
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+    try:
+        await asyncio.gather(*(run_worker(database, deadline, max_id, latencies) for _ in range(concurrency)))
+    finally:
+        await database.stop()
+
+    latencies.sort()
+    print(
+        f"{name:<12} mode={db_settings.pooler_mode:<11} null_pool={db_settings.pooler_null_pool!s:<5} "
+        f"queries={len(latencies):>8} qps={len(latencies) / duration:>10.1f} "
+        f"p50={statistics.median(latencies) * 1000:>7.2f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:>7.2f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pooled-host", required=True)
+    parser.add_argument("--pooled-port", type=int, default=6432)
+    parser.add_argument("--pooled-mode", choices=["session", "transaction"], default="transaction")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--max-id", type=int, default=1000, help="Upper bound of the user ids to look up.")
+    args = parser.parse_args()
+
+    direct = DatabaseSettings(pooler_mode="direct")
+    pooled = direct.model_copy(
+        update={"host": args.pooled_host, "port": args.pooled_port, "pooler_mode": args.pooled_mode}
+    )
+    pooled_null_pool = pooled.model_copy(update={"pooler_null_pool": True})
+
+    for name, db_settings in (("direct", direct), ("pooled", pooled), ("pooled-null", pooled_null_pool)):
+        await run_benchmark(name, db_settings, args.concurrency, args.duration, args.max_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
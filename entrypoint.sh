@@ -15,6 +15,15 @@ if [ "$SERVICE" = "migrations" ]; then
 elif [ "$SERVICE" = "api" ]; then
     echo "Triggering claims api..."
     python entrypoint_api.py
+elif [ "$SERVICE" = "export" ]; then
+    echo "Triggering users export..."
+    python entrypoint_export.py
+elif [ "$SERVICE" = "import" ]; then
+    echo "Triggering users import..."
+    python entrypoint_import.py
+elif [ "$SERVICE" = "calibrate" ]; then
+    echo "Triggering argon2 calibration..."
+    python entrypoint_calibrate.py
 else
     echo "Unknown SERVICE: $SERVICE"
     exit 1
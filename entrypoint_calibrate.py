@@ -0,0 +1,107 @@
+"""
+Calibrate the argon2 cost for this host.
+
+Measures memory/time cost combinations with one verifier process per available core running at once, and
+recommends the most expensive one that stays within the target latency and still verifies at least
+`--min-throughput` passwords per second per core. Concurrent verifiers share the memory bandwidth, which bounds
+argon2 under load, so the latency and throughput are those of a busy host rather than of a single idle core.
+Run it on the deployment host (or an identical one), then copy the printed PASSWORD_ARGON2_* settings:
+
+    python entrypoint_calibrate.py --target-ms 100 --min-throughput 8
+"""
+
+import argparse
+from concurrent.futures import Executor, ProcessPoolExecutor
+import statistics
+import sys
+import time
+
+from passlib.hash import argon2
+
+from src.utils.cpu import available_cpu_count, available_cpus
+
+
+# RFC 9106 / OWASP minimum of 19 MiB up to 256 MiB, in KiB.
+MEMORY_COSTS = (19456, 32768, 47104, 65536, 102400, 131072, 262144)
+MAX_TIME_COST = 10
+PASSWORD = "calibration-Password-1"
+
+
+def verify_many(hashed_password: str, rounds: int) -> list[float]:
+    """Times of `rounds` verifications, run in a pool process."""
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        argon2.verify(PASSWORD, hashed_password)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def measure(
+    pool: Executor, verifiers: int, memory_cost: int, time_cost: int, parallelism: int, rounds: int
+) -> tuple[float, float]:
+    """Median verification time in seconds and verifications per second, with `verifiers` running at once."""
+    hashed_password = argon2.using(memory_cost=memory_cost, time_cost=time_cost, parallelism=parallelism).hash(PASSWORD)
+
+    started = time.perf_counter()
+    futures = [pool.submit(verify_many, hashed_password, rounds) for _ in range(verifiers)]
+    timings = [timing for future in futures for timing in future.result()]
+    elapsed = time.perf_counter() - started
+    return statistics.median(timings), len(timings) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=100.0, help="Maximum verification latency.")
+    parser.add_argument("--min-throughput", type=float, default=8.0, help="Minimum verifications per second per core.")
+    parser.add_argument("--max-memory-mib", type=int, default=256, help="Memory budget of a single hash.")
+    parser.add_argument(
+        "--parallelism", type=int, default=1, help="Lanes per hash, 1 keeps one hash on one core under load."
+    )
+    parser.add_argument("--rounds", type=int, default=5, help="Verifications measured per verifier and combination.")
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    # A hash keeps `parallelism` cores busy, so this many verifiers load every core.
+    verifiers = max(1, available_cpu_count() // args.parallelism)
+    print(
+        f"Calibrating argon2 on {cpus:g} available CPUs with {verifiers} concurrent verifiers, "
+        f"target {args.target_ms:g}ms per verification."
+    )
+    print(f"{'memory':>10} {'time':>5} {'latency':>10} {'per core/s':>11} {'host/s':>8}")
+
+    best: tuple[int, int, float] | None = None
+    with ProcessPoolExecutor(max_workers=verifiers) as pool:
+        for memory_cost in (cost for cost in MEMORY_COSTS if cost <= args.max_memory_mib * 1024):
+            for time_cost in range(1, MAX_TIME_COST + 1):
+                latency, throughput = measure(pool, verifiers, memory_cost, time_cost, args.parallelism, args.rounds)
+                per_core = throughput / cpus
+                print(
+                    f"{memory_cost // 1024:>7}MiB {time_cost:>5} {latency * 1000:>8.1f}ms "
+                    f"{per_core:>11.1f} {throughput:>8.1f}"
+                )
+
+                if latency * 1000 > args.target_ms or per_core < args.min_throughput:
+                    # Higher time costs of this memory cost only get slower.
+                    break
+                if best is None or memory_cost * time_cost > best[0] * best[1]:
+                    best = (memory_cost, time_cost, latency)
+            else:
+                continue
+            if time_cost == 1:
+                # Even the cheapest time cost misses the targets, more memory would only be slower.
+                break
+
+    if best is None:
+        print("No combination meets the targets, relax --target-ms or --min-throughput.", file=sys.stderr)
+        sys.exit(1)
+
+    memory_cost, time_cost, latency = best
+    print(f"\nRecommended ({latency * 1000:.1f}ms per verification under load):")
+    print(f"PASSWORD_ARGON2_TIME_COST={time_cost}")
+    print(f"PASSWORD_ARGON2_MEMORY_COST={memory_cost}")
+    print(f"PASSWORD_ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
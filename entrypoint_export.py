@@ -0,0 +1,31 @@
+import argparse
+import asyncio
+import os
+import sys
+
+from src.dependecies.db_session import database
+from src.services.export import UserExportService
+
+
+async def export_users(export_format: str, output: str) -> None:
+    await database.start(prewarm=0)
+    service = UserExportService(database)
+
+    stream = sys.stdout.buffer if output == "-" else open(output, "wb")
+    try:
+        async for chunk in service.stream(export_format):  # type: ignore[arg-type]
+            stream.write(chunk)
+    finally:
+        if stream is not sys.stdout.buffer:
+            stream.close()
+        await database.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the users table.")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default=os.getenv("EXPORT_FORMAT", "ndjson"))
+    parser.add_argument("--output", default=os.getenv("EXPORT_OUTPUT", "-"), help="File path, '-' for stdout.")
+    args = parser.parse_args()
+
+    print("Starting users export...", file=sys.stderr)
+    asyncio.run(export_users(args.format, args.output))
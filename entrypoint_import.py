@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import os
+import sys
+from typing import AsyncIterator, BinaryIO
+
+from src.dependecies.db_session import database
+from src.services.user_import import UserImportService
+from src.utils.cpu import available_cpu_count
+from src.utils.password_hashing import PasswordHasher
+
+
+async def read_chunks(stream: BinaryIO, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    while chunk := stream.read(chunk_size):
+        yield chunk
+
+
+async def import_users(import_format: str, source: str, report: str) -> None:
+    # The CLI has the host to itself, so it gets a dedicated pool sized to all cores without the API queue limit.
+    await database.start(prewarm=0)
+    cpus = available_cpu_count()
+    hasher = PasswordHasher(executor_type="process", max_workers=cpus, max_queue_depth=sys.maxsize)
+    service = UserImportService(database, hasher=hasher, max_chunks_in_flight=cpus)
+
+    stream = sys.stdin.buffer if source == "-" else open(source, "rb")
+    try:
+        result = await service.import_users(read_chunks(stream), import_format)  # type: ignore[arg-type]
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+        hasher.shutdown()
+        await database.stop()
+
+    with open(report, "wb") as report_file:
+        for error in result.errors:
+            report_file.write(error.model_dump_json().encode() + b"\n")
+
+    print(result.model_dump_json(exclude={"errors"}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import users.")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default=os.getenv("IMPORT_FORMAT", "ndjson"))
+    parser.add_argument("--input", default=os.getenv("IMPORT_INPUT", "-"), help="File path, '-' for stdin.")
+    parser.add_argument(
+        "--report",
+        default=os.getenv("IMPORT_REPORT", "import_errors.ndjson"),
+        help="Where to write the per-row error report.",
+    )
+    args = parser.parse_args()
+
+    print("Starting users import...", file=sys.stderr)
+    asyncio.run(import_users(args.format, args.input, args.report))
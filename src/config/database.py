@@ -1,38 +1,487 @@
 # app/config/database.py
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import Any, AsyncIterator
 
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine, ExceptionContext
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, QueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.config.config import DatabaseSettings
+from src.config.utils import ConnectionURLFactory
+from src.exceptions.app_exceptions import ServiceUnavailableException
+from src.utils.db_metrics import InstrumentedAsyncAdaptedQueuePool, instrument_engine
+from src.utils.deadline import remaining_time
+from src.utils.logging import logger
+from src.utils.query_budget import EXEMPT_EXECUTION_OPTION
+from src.utils.slow_queries import SlowQueryLog
+
+
+# Session.info flag: once set, every statement of the session goes to the primary (read-your-writes).
+USE_PRIMARY = "use_primary"
+
+
+class ReplicaRouter:
+    """
+    Picks a healthy read replica round-robin. Replicas are marked unhealthy on disconnect errors
+    and by a periodic `SELECT 1` probe, and come back once the probe succeeds again.
+    With no healthy replica, reads fall back to the primary.
+    """
+
+    def __init__(self, replicas: list[AsyncEngine], check_interval: float) -> None:
+        self.replicas = replicas
+        self._check_interval = check_interval
+        self._healthy: list[AsyncEngine] = list(replicas)
+        self._picks = 0
+        self._task: asyncio.Task | None = None
+
+        for replica in replicas:
+            event.listen(replica.sync_engine, "handle_error", self._on_error)
+
+    def pick(self) -> AsyncEngine | None:
+        healthy = self._healthy
+        if not healthy:
+            return None
+        self._picks += 1
+        return healthy[self._picks % len(healthy)]
+
+    def is_healthy(self, replica: AsyncEngine) -> bool:
+        return replica in self._healthy
+
+    def _set_health(self, replica: AsyncEngine, healthy: bool) -> None:
+        if healthy == self.is_healthy(replica):
+            return
+
+        if healthy:
+            self._healthy = [engine for engine in self.replicas if engine in self._healthy or engine is replica]
+            logger.info("Read replica %s is back in rotation.", replica.url.host)
+        else:
+            self._healthy = [engine for engine in self._healthy if engine is not replica]
+            logger.warning("Read replica %s is removed from rotation.", replica.url.host)
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        if context.is_disconnect:
+            for replica in self.replicas:
+                if replica.sync_engine is context.engine:
+                    self._set_health(replica, False)
+
+    async def _probe(self, replica: AsyncEngine) -> None:
+        try:
+            async with asyncio.timeout(self._check_interval):
+                async with replica.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            if self.is_healthy(replica):
+                logger.warning("Read replica %s health check failed: %s", replica.url.host, e)
+            self._set_health(replica, False)
+        else:
+            self._set_health(replica, True)
+
+    async def _check_health(self) -> None:
+        while True:
+            await asyncio.gather(*(self._probe(replica) for replica in self.replicas))
+            await asyncio.sleep(self._check_interval)
+
+    def start(self) -> None:
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._check_health(), name="replica-health-check")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+class PoolHealthChecker:
+    """
+    Replacement for `pool_pre_ping`: instead of a `SELECT 1` round trip on every checkout,
+    idle pooled connections are validated in the background every `interval` seconds.
+
+    The pool hands out connections FIFO, so checking out `checkedin()` connections one by one visits each idle one.
+    A dead connection raises a disconnect error, which makes SQLAlchemy invalidate it together with the rest of
+    the pool created before the failure (e.g. after a failover), so requests get fresh connections.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], interval: float) -> None:
+        self._engines = engines
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def _check_engine(self, engine: AsyncEngine) -> None:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+
+        for _ in range(pool.checkedin()):
+            # Requests took the idle connections meanwhile, they don't need to be checked.
+            if not pool.checkedin():
+                return
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except DBAPIError as e:
+                if not e.connection_invalidated:
+                    raise
+                logger.warning("Invalidated stale connections to %s: %s", engine.url.host, e)
+                return
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            for engine in self._engines:
+                try:
+                    await self._check_engine(engine)
+                except Exception as e:
+                    logger.warning("Connection health check for %s failed: %s", engine.url.host, e)
+
+    def start(self) -> None:
+        if self._interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pool-health-check")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+async def execute_with_reconnect(session: AsyncSession, stmt: Any, params: Any = None) -> Any:
+    """
+    Execute a statement, retrying it once on a fresh connection if the pooled one turned out to be dead.
+    Only plain SELECTs in a session that hasn't written anything are retried, anything else is not idempotent.
+    """
+    try:
+        return await session.execute(stmt, params)
+    except DBAPIError as e:
+        is_plain_read = isinstance(stmt, Select) and stmt._for_update_arg is None
+        if not e.connection_invalidated or not is_plain_read or session.info.get(USE_PRIMARY):
+            raise
+
+    # `close()` rather than `rollback()`: it discards the broken transaction without expiring loaded objects.
+    await session.close()
+    return await session.execute(stmt, params)
+
+
+# Transaction-local `statement_timeout`, the value is a bound parameter so the statement text never changes.
+STATEMENT_TIMEOUT_SQL = text("SELECT set_config('statement_timeout', :timeout, true)").execution_options(
+    **{EXEMPT_EXECUTION_OPTION: True}
+)
+
+
+def statement_timeout_params() -> dict[str, str] | None:
+    """`STATEMENT_TIMEOUT_SQL` parameters bounding a transaction by the time left until the request deadline."""
+    remaining = remaining_time()
+    if remaining is None:
+        return None
+    # A passed deadline still gets a positive timeout (0 would disable it), so the next statement fails fast.
+    return {"timeout": str(max(int(remaining * 1000), 1))}
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to a read replica and everything else to the primary.
+    After the first write (or locking read) the session sticks to the primary,
+    so reads issued later in the same unit of work see its own writes.
+    """
+
+    def __init__(self, *args: Any, primary: AsyncEngine, router: ReplicaRouter, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.router = router
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:
+        is_plain_read = isinstance(clause, Select) and clause._for_update_arg is None
+        if self._flushing or not is_plain_read:
+            self.info[USE_PRIMARY] = True
+
+        if not self.info.get(USE_PRIMARY):
+            replica = self.router.pick()
+            if replica is not None:
+                return replica.sync_engine
+
+        return self.primary.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _apply_request_deadline(session: Session, transaction: Any, connection: Any) -> None:
+    params = statement_timeout_params()
+    if params is not None:
+        connection.execute(STATEMENT_TIMEOUT_SQL, params)
+
+
+def reads_from_replica(session: AsyncSession) -> bool:
+    """Whether the plain reads of `session` may be served by a (possibly lagging) read replica."""
+    sync_session = session.sync_session
+    return (
+        isinstance(sync_session, RoutingSession)
+        and bool(sync_session.router.replicas)
+        and not session.info.get(USE_PRIMARY)
+    )
+
+
+class LazySession:
+    """
+    Request-scoped stand-in for `AsyncSession` that builds the real session on first use.
+
+    Requests that never touch the database (failed auth or validation, cache hits) pay nothing,
+    and `commit()`/`close()` hand the connection back to the pool right away instead of when the
+    request finishes. Closing only detaches loaded objects, the proxy opens a fresh session on next use
+    and carries `info` over, so primary stickiness survives.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self._database = database
+        self._session: AsyncSession | None = None
+        self._info: dict[str, Any] = {}
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._database.open_session()
+            self._session.info.update(self._info)
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    @property
+    def info(self) -> dict[str, Any]:
+        return self.session.info
+
+    def in_transaction(self) -> bool:
+        return self._session is not None and self._session.in_transaction()
+
+    async def commit(self) -> None:
+        await self.session.commit()
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is None:
+            return
+
+        session, self._session = self._session, None
+        self._info.update(session.info)
+        await self._database.close_session(session)
 
 
 class Database:
-    def __init__(self) -> None:
-        self._db_settings = DatabaseSettings()
-
-        self.engine: AsyncEngine = create_async_engine(
-            url=self._db_settings.connection_url,
-            echo=self._db_settings.echo,
-            pool_size=self._db_settings.pool_size,
-            pool_pre_ping=self._db_settings.pool_pre_ping,
-            pool_recycle=self._db_settings.pool_recycle,
+    """
+    Owns the engines for the app lifetime: `start()` builds them and prewarms the pools,
+    `stop()` stops handing out sessions, waits for the checked-out ones to finish and disposes the pools.
+    """
+
+    def __init__(self, db_settings: DatabaseSettings | None = None) -> None:
+        self._db_settings = db_settings or DatabaseSettings()
+
+        self.engine: AsyncEngine
+        self.replica_engines: list[AsyncEngine] = []
+        self.router: ReplicaRouter
+        self.health_checker: PoolHealthChecker
+        self.session_factory: async_sessionmaker
+        self.slow_query_log: SlowQueryLog | None = None
+
+        self.started = False
+        self.ready = False
+        self._accepting = False
+        self._checked_out = 0
+        self._drained = asyncio.Event()
+
+    def _create_engines(self) -> None:
+        engine_options: dict[str, Any] = {
+            "echo": self._db_settings.echo,
+            "connect_args": ConnectionURLFactory.create_connect_args(self._db_settings),
+        }
+        if self._db_settings.pooler_null_pool:
+            engine_options["poolclass"] = NullPool
+        else:
+            engine_options |= {
+                "poolclass": InstrumentedAsyncAdaptedQueuePool,
+                "pool_size": self._db_settings.pool_size,
+                # The background health checker replaces the per-checkout ping when it is enabled.
+                "pool_pre_ping": self._db_settings.pool_pre_ping and not self._db_settings.pool_health_check_interval,
+                "pool_recycle": self._db_settings.pool_recycle,
+            }
+
+        self.engine = create_async_engine(url=self._db_settings.connection_url, **engine_options)
+        self.replica_engines = [
+            create_async_engine(url=replica_url, **engine_options) for replica_url in self._db_settings.replica_urls
+        ]
+
+        self.slow_query_log = None
+        if self._db_settings.slow_query_threshold > 0:
+            explain_engine = None
+            if self._db_settings.slow_query_explain_sample_rate > 0:
+                # Plans are captured on their own unpooled connections, off the primary when a replica exists.
+                # Only a replica gets EXPLAIN ANALYZE, the primary runs plain EXPLAIN.
+                explain_url = next(iter(self._db_settings.replica_urls), self._db_settings.connection_url)
+                explain_engine = create_async_engine(
+                    url=explain_url,
+                    poolclass=NullPool,
+                    connect_args=engine_options["connect_args"],
+                )
+            self.slow_query_log = SlowQueryLog(
+                threshold=self._db_settings.slow_query_threshold,
+                explain_engine=explain_engine,
+                sample_rate=self._db_settings.slow_query_explain_sample_rate,
+                max_explains_per_minute=self._db_settings.slow_query_explain_max_per_minute,
+                explain_timeout=self._db_settings.slow_query_explain_timeout,
+                analyze=bool(self._db_settings.replica_urls),
+            )
+
+        instrument_engine(self.engine, "primary", self.slow_query_log)
+        for i, replica in enumerate(self.replica_engines):
+            instrument_engine(replica, f"replica-{i}", self.slow_query_log)
+
+        self.router = ReplicaRouter(self.replica_engines, self._db_settings.replica_health_check_interval)
+        self.health_checker = PoolHealthChecker(
+            [self.engine, *self.replica_engines],
+            self._db_settings.pool_health_check_interval,
         )
 
         self.session_factory = async_sessionmaker(
             bind=self.engine,
             expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            primary=self.engine,
+            router=self.router,
         )
 
+    @staticmethod
+    async def _prewarm(engine: AsyncEngine, connections: int) -> None:
+        # Hold all connections at once, so the pool really opens `connections` distinct ones.
+        results = await asyncio.gather(*(engine.connect() for _ in range(connections)), return_exceptions=True)
+
+        opened = [conn for conn in results if isinstance(conn, AsyncConnection)]
+        for conn in opened:
+            await conn.close()
+
+        failed = len(results) - len(opened)
+        if failed:
+            logger.warning("Prewarmed %d/%d connections to %s.", len(opened), connections, engine.url.host)
+        else:
+            logger.info("Prewarmed %d connections to %s.", connections, engine.url.host)
+
+    async def start(self, prewarm: int | None = None) -> None:
+        if self.started:
+            return
+
+        self._create_engines()
+        self.started = True
+        self._accepting = True
+
+        connections = self._db_settings.pool_prewarm if prewarm is None else prewarm
+        connections = min(connections, self._db_settings.pool_size)
+        if self._db_settings.pooler_null_pool:
+            # Nothing to keep warm, every checkout opens a new connection to the pooler.
+            connections = 0
+        if connections > 0:
+            engines = [self.engine, *self.replica_engines]
+            await asyncio.gather(*(self._prewarm(engine, connections) for engine in engines))
+
+        self.router.start()
+        self.health_checker.start()
+        self.ready = True
+
+    async def stop(self, drain_timeout: float | None = None) -> None:
+        if not self.started:
+            return
+
+        self.ready = False
+        self._accepting = False
+
+        drain_timeout = self._db_settings.shutdown_drain_timeout if drain_timeout is None else drain_timeout
+        if self._checked_out:
+            logger.info("Waiting for %d checked-out database sessions to finish.", self._checked_out)
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("%d database sessions still checked out after %.1fs.", self._checked_out, drain_timeout)
+
+        await self.router.stop()
+        await self.health_checker.stop()
+        if self.slow_query_log is not None:
+            await self.slow_query_log.stop()
+        for engine in [self.engine, *self.replica_engines]:
+            await engine.dispose()
+
+        self.started = False
+        logger.info("Disposed database engines.")
+
+    def _checkout(self) -> None:
+        if not self._accepting:
+            raise ServiceUnavailableException("Database is not accepting new work")
+        self._checked_out += 1
+        self._drained.clear()
+
+    def _checkin(self) -> None:
+        self._checked_out -= 1
+        if not self._checked_out:
+            self._drained.set()
+
+    def open_session(self) -> AsyncSession:
+        self._checkout()
+        return self.session_factory()
+
+    async def close_session(self, session: AsyncSession) -> None:
+        try:
+            await session.close()
+        finally:
+            self._checkin()
+
+    def lazy_session(self) -> LazySession:
+        return LazySession(self)
+
     @asynccontextmanager
-    async def get_async_session(self) -> AsyncIterator[AsyncSession]:
-        async with self.session_factory() as session:
+    async def get_async_session(self, use_primary: bool = False) -> AsyncIterator[AsyncSession]:
+        session = self.open_session()
+        try:
+            if use_primary:
+                session.info[USE_PRIMARY] = True
             yield session
+        finally:
+            await self.close_session(session)
 
     @asynccontextmanager
-    async def get_connection(self) -> AsyncIterator[AsyncConnection]:
-        async with self.engine.connect() as conn:
-            yield conn
+    async def get_connection(self, readonly: bool = False) -> AsyncIterator[AsyncConnection]:
+        """
+        Connection bounded by the request deadline. The statement timeout autobegins a transaction
+        that is rolled back on exit, so `commit()` writes, including ones made on the raw driver connection:
+        an asyncpg `transaction()` opened there is only a savepoint inside it.
+        """
+        self._checkout()
+        try:
+            engine = (self.router.pick() if readonly else None) or self.engine
+            async with engine.connect() as conn:
+                params = statement_timeout_params()
+                if params is not None:
+                    await conn.execute(STATEMENT_TIMEOUT_SQL, params)
+                yield conn
+        finally:
+            self._checkin()
+
+    def replica_stats(self) -> dict[str, float]:
+        """Health of the read replicas, pool usage is exported by the engine instrumentation."""
+        stats: dict[str, float] = {
+            "replicas": len(self.replica_engines),
+            "healthy_replicas": sum(self.router.is_healthy(replica) for replica in self.replica_engines),
+        }
+        for i, replica in enumerate(self.replica_engines):
+            stats[f"replica_{i}_healthy"] = float(self.router.is_healthy(replica))
+        return stats
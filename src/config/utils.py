@@ -1,5 +1,6 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from urllib.parse import unquote
+from uuid import uuid4
 
 from sqlalchemy.engine import URL
 
@@ -34,3 +35,21 @@ class ConnectionURLFactory:
 
         url = URL.create(**kwargs)  # type: ignore
         return unquote(url.render_as_string(hide_password=False))
+
+    @staticmethod
+    def create_connect_args(db_settings: "DatabaseSettings") -> dict[str, Any]:
+        """
+        Create asyncpg connect arguments.
+        In PgBouncer transaction mode consecutive statements may land on different server connections,
+        so named prepared statements must be unique and never cached per client connection.
+        """
+        if db_settings.pooler_mode != "transaction":
+            return {}
+
+        return {
+            # asyncpg's statement cache
+            "statement_cache_size": 0,
+            # SQLAlchemy's prepared statement cache on top of asyncpg
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
@@ -1 +1,5 @@
 SQLALCHEMY_POSTGRES_DRIVER_NAME: str = "postgresql+asyncpg"  # SQLAlchemy driver for SQL server
+USERS_CHANGED_CHANNEL: str = "users_changed"  # Postgres NOTIFY channel fed by the users table trigger
+TRACE_ID_HEADER: str = "X-Request-ID"  # accepted from clients, echoed in responses and sent on outbound calls
+REQUEST_START_HEADER: str = "X-Request-Start"  # set by the proxy, used to measure queue time
+REQUEST_TIMEOUT_HEADER: str = "X-Request-Timeout"  # seconds the client is willing to wait, shortens the route default
@@ -1,13 +1,22 @@
-from typing import AsyncIterator
+from typing import AsyncIterator, cast
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config.database import Database
+from src.repositories.users import create_user_loader
 
 
 database = Database()
+user_loader = create_user_loader(database)
 
 
 async def get_session() -> AsyncIterator[AsyncSession]:
-    async with database.get_async_session() as session:
-        yield session
+    """
+    Request-scoped session that is only created on first use and releases its connection
+    as soon as the unit of work commits or the session is closed (see `LazySession`).
+    """
+    session = database.lazy_session()
+    try:
+        yield cast(AsyncSession, session)
+    finally:
+        await session.close()
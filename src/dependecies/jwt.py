@@ -2,7 +2,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.dependecies.db_session import get_session
+from src.dependecies.db_session import database, get_session, user_loader
 from src.models import User
 from src.services.users import UserService
 
@@ -16,12 +16,57 @@ async def get_current_user(
 ) -> User:
     token = credentials.credentials
 
-    user_service = UserService(session)
+    user_service = UserService(session, database, user_loader=user_loader)
 
     try:
-        return await user_service.get_user_by_token(token)
+        user = await user_service.get_user_by_token(token)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
         )
+    finally:
+        # Don't keep the lookup's connection pinned while the handler runs and the response is serialized.
+        await session.close()
+
+    return user
+
+
+async def get_current_superuser(user: User = Depends(get_current_user)) -> User:
+    """
+    Gate for admin endpoints. The flag is read from the stored user rather than the token claims,
+    so revoking it takes effect before issued tokens expire.
+    """
+    if not user.is_active or not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+
+    return user
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_session),
+) -> User:
+    """
+    Lightweight variant of `get_current_user` for endpoints that only need the token claims.
+    With `JWT_CLAIMS_ONLY_AUTH` enabled the user is built from the access token without a DB round trip,
+    so the returned instance is detached and has no `hashed_password`.
+    """
+    token = credentials.credentials
+
+    user_service = UserService(session, database, user_loader=user_loader)
+
+    try:
+        user = await user_service.get_principal_by_token(token)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+        )
+    finally:
+        await session.close()
+
+    return user
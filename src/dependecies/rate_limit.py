@@ -0,0 +1,53 @@
+from fastapi import Request
+
+from src.config.config import settings
+from src.dependecies.db_session import database
+from src.exceptions.app_exceptions import TooManyRequestsException
+from src.utils.rate_limit import (
+    AbstractRateLimitBackend,
+    InMemoryRateLimitBackend,
+    PostgresRateLimitBackend,
+    RateLimiter,
+    RateLimitRule,
+)
+
+
+def _create_backend() -> AbstractRateLimitBackend:
+    if settings.LOGIN_RATE_LIMIT_BACKEND == "postgres":
+        return PostgresRateLimitBackend(database)
+    return InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(_create_backend())
+
+LOGIN_PER_IP = RateLimitRule("login:ip", settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS)
+LOGIN_PER_EMAIL = RateLimitRule(
+    "login:email", settings.LOGIN_RATE_LIMIT_PER_EMAIL, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+)
+
+
+async def login_rate_limit(request: Request) -> None:
+    """
+    Rejects login attempts over the per-IP or per-email limit with 429, before the user lookup
+    and the password verification. The per-IP limit is checked first, so a client spraying
+    emails can't fill the per-email counters once it is limited.
+    """
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return
+
+    if request.client is not None:
+        retry_after = await rate_limiter.check(LOGIN_PER_IP, request.client.host)
+        if retry_after is not None:
+            raise TooManyRequestsException("Too many login attempts, please retry later", retry_after)
+
+    # FastAPI has already read the body for the endpoint, this parses the cached bytes.
+    # A body that isn't JSON skips the per-email limit and is rejected by the endpoint validation.
+    try:
+        body = await request.json()
+    except ValueError:
+        return
+    email = body.get("email") if isinstance(body, dict) else None
+    if isinstance(email, str):
+        retry_after = await rate_limiter.check(LOGIN_PER_EMAIL, email.strip().lower())
+        if retry_after is not None:
+            raise TooManyRequestsException("Too many login attempts, please retry later", retry_after)
@@ -0,0 +1,23 @@
+"""
+Liveness and readiness probes
+"""
+
+from fastapi import APIRouter, HTTPException, status
+
+from src.dependecies.db_session import database
+from src.middlewares.timing import TimedAPIRoute
+
+
+router = APIRouter(prefix="/health", tags=["Health"], route_class=TimedAPIRoute)
+
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    if not database.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Not ready")
+    return {"status": "ok"}
@@ -2,28 +2,37 @@
 Test endpoint
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.dependecies.db_session import get_session
-from src.dependecies.jwt import get_current_user
+from src.dependecies.db_session import database, get_session, user_loader
+from src.dependecies.jwt import get_current_principal, get_current_superuser
+from src.dependecies.rate_limit import login_rate_limit
+from src.middlewares.timing import TimedAPIRoute
 from src.models import User
 from src.schemas.users import (
     RefreshTokenRequestSchema,
     UserCreateRequestSchema,
     UserDetailSchema,
+    UserImportReportSchema,
     UserJwtSchema,
     UserLoginRequestSchema,
+    UserPageSchema,
 )
+from src.services.export import EXPORT_MEDIA_TYPES, UserExportService
+from src.services.user_import import UserImportService
 from src.services.users import UserService
 
 
-router = APIRouter(tags=["Users"], redirect_slashes=True)
+router = APIRouter(tags=["Users"], redirect_slashes=True, route_class=TimedAPIRoute)
 
 
 @router.post("", response_model=UserJwtSchema)
 async def create_user(user: UserCreateRequestSchema, session: AsyncSession = Depends(get_session)):
-    user_service = UserService(session)
+    user_service = UserService(session, database)
     try:
         tokens = await user_service.create_user(user_data=user)
     except ValueError as e:
@@ -32,12 +41,50 @@ async def create_user(user: UserCreateRequestSchema, session: AsyncSession = Dep
     return tokens
 
 
+@router.get("", response_model=UserPageSchema)
+async def list_users(
+    is_active: bool | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    _: User = Depends(get_current_superuser),
+    session: AsyncSession = Depends(get_session),
+):
+    user_service = UserService(session, database)
+    try:
+        return await user_service.list_users(is_active=is_active, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    _: User = Depends(get_current_superuser),
+):
+    export_service = UserExportService(database)
+    return StreamingResponse(
+        export_service.stream(export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
+
+
+@router.post("/import", response_model=UserImportReportSchema)
+async def import_users(
+    request: Request,
+    import_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    _: User = Depends(get_current_superuser),
+):
+    import_service = UserImportService(database)
+    return await import_service.import_users(request.stream(), import_format)
+
+
 @router.get(
     "/me",
     response_model=UserDetailSchema,
 )
 async def get_me(
-    user: User = Depends(get_current_user),
+    user: User = Depends(get_current_principal),
 ):
     return user
 
@@ -46,12 +93,13 @@ async def get_me(
     "/login",
     response_model=UserJwtSchema,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(login_rate_limit)],
 )
 async def login(
     data: UserLoginRequestSchema,
     session: AsyncSession = Depends(get_session),
 ):
-    service = UserService(session)
+    service = UserService(session, database)
 
     try:
         return await service.login(
@@ -74,7 +122,7 @@ async def refresh_tokens(
     data: RefreshTokenRequestSchema,
     session: AsyncSession = Depends(get_session),
 ):
-    service = UserService(session)
+    service = UserService(session, database, user_loader=user_loader)
 
     try:
         return await service.refresh_tokens(data.refresh_token)
@@ -0,0 +1,38 @@
+"""
+Application exceptions that are translated into HTTP responses by the registered exception handlers.
+"""
+
+import math
+
+from fastapi import status
+
+from src.exceptions.base_exceptions import BaseAppException
+
+
+class ServiceUnavailableException(BaseAppException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    message = "Service is temporarily unavailable, please retry later"
+    headers = {"Retry-After": "1"}
+
+
+class PasswordHashingPoolSaturatedError(ServiceUnavailableException):
+    message = "Too many concurrent password operations, please retry later"
+
+
+class OverloadedException(ServiceUnavailableException):
+    message = "Server is overloaded, please retry later"
+
+
+class GatewayTimeoutException(BaseAppException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    message = "Request deadline exceeded"
+
+
+class TooManyRequestsException(BaseAppException):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    message = "Too many requests, please retry later"
+
+    def __init__(self, message: str | None = None, retry_after: float | None = None):
+        super().__init__(message)
+        if retry_after is not None:
+            self.headers = {"Retry-After": str(max(math.ceil(retry_after), 1))}
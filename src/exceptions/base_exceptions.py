@@ -6,8 +6,9 @@ The file contains the base exception class for handling processing errors in the
 class BaseAppException(Exception):
     status_code: int
     message: str
+    headers: dict[str, str] | None = None
 
-    def init(self, message: str | None = None):
+    def __init__(self, message: str | None = None):
         if message:
             self.message = message
         super().__init__(self.message)
@@ -0,0 +1,12 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from src.exceptions.base_exceptions import BaseAppException
+
+
+async def app_exception_handler(request: Request, exc: BaseAppException) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.message},
+        headers=exc.headers,
+    )
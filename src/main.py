@@ -7,24 +7,79 @@ import httpx
 import uvicorn
 
 from src.config.config import settings
+from src.constants import TRACE_ID_HEADER, USERS_CHANGED_CHANNEL
+from src.dependecies.db_session import database, user_loader
+from src.dependecies.rate_limit import rate_limiter
+from src.endpoints import health
 from src.endpoints.routers import api_router
-
-# Init of the httpx client for the whole app.
-from src.utils.logging import LoggingConfig, logger
+from src.exceptions.base_exceptions import BaseAppException
+from src.exceptions.handlers import app_exception_handler
+from src.middlewares.admission import AdmissionControlMiddleware, admission_limit
+from src.middlewares.deadline import DeadlineMiddleware, apply_deadline_timeout
+from src.middlewares.timing import RequestTimingMiddleware, inject_trace_id
+from src.repositories.cache import handle_users_changed, user_cache
+from src.utils.cpu import available_cpu_count, available_cpus
+from src.utils.jwt import decoded_token_cache
+from src.utils.logging import LoggingConfig, logger, logging_stats
+from src.utils.metrics import StatsPublisher, create_metrics_app, mark_worker_dead, reset_multiprocess_dir
+from src.utils.password_hashing import password_hasher
+from src.utils.pg_listener import PostgresNotificationListener
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Lifespan handler to create and close global HTTP Client."""
+    """
+    Lifespan handler to start and stop the database engines, global HTTP Client,
+    the user cache invalidation listener, the rate limit backend and the metrics publisher.
+    """
+    # Startup only completes (and the worker starts serving) once the pools are prewarmed.
+    await database.start()
+
+    users_listener = PostgresNotificationListener(
+        USERS_CHANGED_CHANNEL,
+        on_notification=handle_users_changed,
+        on_reconnect=user_cache.clear,
+    )
+    if settings.USER_CACHE_ENABLED:
+        users_listener.start()
+    rate_limiter.backend.start()
+
+    stats_publisher = StatsPublisher(
+        {
+            "password_hasher": password_hasher.stats,
+            "jwt_decode_cache": decoded_token_cache.stats,
+            "user_cache": user_cache.stats,
+            "user_loader": user_loader.stats,
+            "logging": logging_stats,
+            "admission": admission_limit.stats,
+            "rate_limiter": rate_limiter.stats,
+            "database": database.replica_stats,
+        },
+        interval=settings.METRICS_STATS_INTERVAL,
+    )
+    if settings.METRICS_ENABLED:
+        stats_publisher.start()
+
+    # Init of the httpx client for the whole app.
     async with httpx.AsyncClient(
         timeout=httpx.Timeout(60.0, connect=5.0, read=60.0, write=60.0, pool=5.0),
         limits=httpx.Limits(max_connections=200, max_keepalive_connections=20),
+        event_hooks={"request": [inject_trace_id, apply_deadline_timeout]},
     ) as app_client:
         logger.info("Created global HTTP Client for the app lifespan.")
         app.state.app_client = app_client  # type: ignore[attr-defined]
         yield
     logger.info("Destroyed global HTTP Client for the app lifespan.")
 
+    await stats_publisher.stop()
+    await rate_limiter.backend.stop()
+    await users_listener.stop()
+    await database.stop()
+    mark_worker_dead()
+
+    password_hasher.shutdown()
+    logger.info("Shut down password hashing pool.")
+
 
 # App initialization
 def create_api() -> FastAPI:
@@ -39,36 +94,95 @@ def create_api() -> FastAPI:
     )
 
     # Middlewares
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_timeout=settings.REQUEST_TIMEOUT_DEFAULT,
+        route_timeouts=settings.REQUEST_TIMEOUT_ROUTES,
+        min_timeout=settings.REQUEST_TIMEOUT_MIN,
+    )
+    if settings.ADMISSION_CONTROL_ENABLED:
+        # Inside CORS and timing, so shed responses still carry CORS headers and are timed.
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            limit=admission_limit,
+            route_priorities=settings.ADMISSION_ROUTE_PRIORITIES,
+            exempt_path_prefixes=settings.ADMISSION_EXEMPT_PATH_PREFIXES,
+        )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.BACKEND_CORS_ORIGINS,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[TRACE_ID_HEADER, *(["Server-Timing"] if settings.SERVER_TIMING_HEADER_ENABLED else [])],
+    )
+    # Added last so it is the outermost middleware and times everything below it.
+    app.add_middleware(
+        RequestTimingMiddleware,
+        server_timing_enabled=settings.SERVER_TIMING_HEADER_ENABLED,
+        query_budget_exempt_path_prefixes=settings.QUERY_BUDGET_EXEMPT_PATH_PREFIXES,
     )
 
+    # Exception handlers
+    app.add_exception_handler(BaseAppException, app_exception_handler)
+
     # Routers
+    app.include_router(health.router)
     app.include_router(api_router)
 
+    if settings.METRICS_ENABLED:
+        app.mount("/metrics", create_metrics_app())
+
     return app
 
 
+def _worker_count() -> tuple[int, str]:
+    if "WEB_CONCURRENCY" in os.environ:
+        return int(os.environ["WEB_CONCURRENCY"]), "WEB_CONCURRENCY"
+    if settings.SERVER_WORKERS:
+        return settings.SERVER_WORKERS, "SERVER_WORKERS"
+    return available_cpu_count(), f"{available_cpus():g} available CPUs"
+
+
 def run_api():
     in_development_mode = os.getenv("ENV", "prod") == "dev"
-    use_web_concurrency = "WEB_CONCURRENCY" in os.environ
 
     options = {
-        "host": "0.0.0.0",
-        "port": 8000,
-        "log_level": "debug",
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "log_level": LoggingConfig.LOG_LEVEL.lower(),
         "reload": in_development_mode,
         "factory": True,
         "log_config": LoggingConfig.LOGGING_CONFIG,
     }
 
-    if not in_development_mode and use_web_concurrency:
-        options["workers"] = int(os.getenv("WEB_CONCURRENCY"))
-
+    if not in_development_mode:
+        workers, workers_source = _worker_count()
+        options |= {
+            "workers": workers,
+            "loop": "uvloop",
+            "http": "httptools",
+            "backlog": settings.SERVER_BACKLOG,
+            "timeout_keep_alive": settings.SERVER_KEEP_ALIVE_TIMEOUT,
+            "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY,
+            "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        }
+        # Only the multi-worker supervisor replaces a recycled worker, a single process would just exit.
+        if workers > 1:
+            options["limit_max_requests"] = settings.SERVER_LIMIT_MAX_REQUESTS
+
+        logger.info(
+            "Production profile: workers=%d (%s), loop=uvloop, http=httptools, backlog=%d, keep_alive=%ds, "
+            "limit_concurrency=%s, limit_max_requests=%s.",
+            workers,
+            workers_source,
+            settings.SERVER_BACKLOG,
+            settings.SERVER_KEEP_ALIVE_TIMEOUT,
+            settings.SERVER_LIMIT_CONCURRENCY,
+            options.get("limit_max_requests"),
+        )
+
+    reset_multiprocess_dir()
     uvicorn.run("src.main:create_api", **options)
 
 
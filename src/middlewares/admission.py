@@ -0,0 +1,129 @@
+"""
+Admission control / load shedding
+"""
+
+import time
+from typing import Literal
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config.config import settings
+from src.exceptions.app_exceptions import OverloadedException
+from src.utils.request_timing import get_request_timing
+
+
+Priority = Literal["high", "normal", "low"]
+
+# Share of the concurrency limit each priority may fill, lower priorities are rejected first as load grows.
+PRIORITY_SHARES: dict[Priority, float] = {"high": 1.0, "normal": 0.85, "low": 0.6}
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD concurrency limit using DB pool checkout wait as the congestion signal.
+
+    While requests get connections faster than `target_pool_wait` and the limit is in use, it grows by ~1 per
+    `limit` completed requests. A slower checkout means requests are queueing on the pool, so the limit is cut by
+    `backoff`, at most once per `decrease_interval` so a single burst doesn't collapse it.
+    Requests that didn't touch the database carry no signal and leave the limit unchanged.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        target_pool_wait: float,
+        backoff: float = 0.9,
+        decrease_interval: float = 0.1,
+    ) -> None:
+        self.limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._target_pool_wait = target_pool_wait
+        self._backoff = backoff
+        self._decrease_interval = decrease_interval
+        self._last_decrease = 0.0
+
+        self.in_flight = 0
+        self.shed: dict[Priority, int] = {"high": 0, "normal": 0, "low": 0}
+
+    def try_acquire(self, priority: Priority) -> bool:
+        if self.in_flight >= self.limit * PRIORITY_SHARES[priority]:
+            self.shed[priority] += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, pool_wait: float | None) -> None:
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if pool_wait is None:
+            return
+
+        if pool_wait > self._target_pool_wait:
+            now = time.monotonic()
+            if now - self._last_decrease >= self._decrease_interval:
+                self.limit = max(self._min_limit, self.limit * self._backoff)
+                self._last_decrease = now
+        elif in_flight >= self.limit / 2:
+            # Only grow while the limit is actually used, otherwise it drifts up without any evidence.
+            self.limit = min(self._max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            **{f"shed_{priority}": count for priority, count in self.shed.items()},
+        }
+
+
+admission_limit = AdaptiveConcurrencyLimit(
+    initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    target_pool_wait=settings.ADMISSION_TARGET_POOL_WAIT,
+)
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware rejecting requests with 503 and `Retry-After` once the adaptive concurrency limit is
+    reached, instead of letting them queue for a pool connection until they time out.
+    Must run inside `RequestTimingMiddleware`, which collects the pool checkout wait of the request.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limit: AdaptiveConcurrencyLimit,
+        route_priorities: dict[str, Priority],
+        exempt_path_prefixes: list[str],
+    ) -> None:
+        self.app = app
+        self.limit = limit
+        self.route_priorities = route_priorities
+        self.exempt_path_prefixes = tuple(exempt_path_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        # Routing hasn't happened yet, priorities are looked up by the raw path.
+        priority = self.route_priorities.get(scope["path"].rstrip("/"), "normal")
+        if not self.limit.try_acquire(priority):
+            exc = OverloadedException()
+            response = JSONResponse(status_code=exc.status_code, content={"detail": exc.message}, headers=exc.headers)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            timing = get_request_timing()
+            if timing is not None and timing.pool_checkouts:
+                self.limit.release(pool_wait=timing.pool_wait / timing.pool_checkouts)
+            else:
+                self.limit.release(pool_wait=None)
@@ -0,0 +1,138 @@
+"""
+Request deadlines
+"""
+
+import asyncio
+import math
+import time
+
+from fastapi.responses import JSONResponse
+import httpx
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.constants import REQUEST_TIMEOUT_HEADER
+from src.exceptions.app_exceptions import GatewayTimeoutException
+from src.utils.deadline import deadline_var, remaining_time
+from src.utils.logging import logger
+
+
+def _has_body(headers: Headers) -> bool:
+    return headers.get("content-length", "0") != "0" or "transfer-encoding" in headers
+
+
+class DeadlineMiddleware:
+    """
+    Pure ASGI middleware giving every request a deadline: the per-route default, shortened by the client's
+    `X-Request-Timeout` header. The remaining time bounds DB statements and outbound HTTP calls.
+    Header values below `min_timeout` are raised to it, and values that aren't finite numbers are ignored.
+
+    The handler is cancelled once the deadline passes (answered with 504 if nothing was sent yet)
+    or the client disconnects, so work nobody waits for anymore releases its connections.
+    """
+
+    def __init__(
+        self, app: ASGIApp, default_timeout: float, route_timeouts: dict[str, float], min_timeout: float = 0.1
+    ) -> None:
+        self.app = app
+        self.default_timeout = default_timeout
+        self.route_timeouts = route_timeouts
+        self.min_timeout = min_timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        timeout = self.route_timeouts.get(scope["path"].rstrip("/"), self.default_timeout)
+        try:
+            requested = float(headers[REQUEST_TIMEOUT_HEADER])
+        except (KeyError, ValueError):
+            requested = math.inf
+        if math.isfinite(requested):
+            timeout = min(timeout, max(requested, self.min_timeout))
+
+        token = deadline_var.set(time.monotonic() + timeout)
+        try:
+            await self._run(scope, receive, send, headers, timeout)
+        finally:
+            deadline_var.reset(token)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, headers: Headers, timeout: float) -> None:
+        request_read = asyncio.Event()
+        disconnected = asyncio.Event()
+        response_started = False
+        pending: list[Message] = []
+
+        if not _has_body(headers):
+            # Nothing for the handler to read, consume the empty request message now to watch for a disconnect.
+            pending.append(await receive())
+            request_read.set()
+
+        async def receive_wrapper() -> Message:
+            if pending:
+                return pending.pop()
+            if request_read.is_set():
+                # Only a disconnect can follow the body, `watch_disconnect` is the one reading it.
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                request_read.set()
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def watch_disconnect() -> None:
+            await request_read.wait()
+            while not disconnected.is_set():
+                if (await receive())["type"] == "http.disconnect":
+                    disconnected.set()
+
+        async def run_app() -> None:
+            await self.app(scope, receive_wrapper, send_wrapper)
+
+        app_task: asyncio.Task[None] = asyncio.create_task(run_app())
+        watcher: asyncio.Task[None] = asyncio.create_task(watch_disconnect())
+        try:
+            done, _ = await asyncio.wait({app_task, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if app_task in done:
+                app_task.result()
+                return
+
+            app_task.cancel()
+            await asyncio.wait({app_task})
+        finally:
+            app_task.cancel()
+            watcher.cancel()
+
+        if disconnected.is_set():
+            logger.info("Client disconnected, cancelled %s %s.", scope["method"], scope["path"])
+            return
+
+        logger.warning("Deadline of %.1fs exceeded, cancelled %s %s.", timeout, scope["method"], scope["path"])
+        if not response_started:
+            exc = GatewayTimeoutException()
+            response = JSONResponse(status_code=exc.status_code, content={"detail": exc.message}, headers=exc.headers)
+            await response(scope, receive, send)
+
+
+async def apply_deadline_timeout(request: httpx.Request) -> None:
+    """httpx request hook capping the client timeouts by the time left until the request deadline."""
+    remaining = remaining_time()
+    if remaining is None:
+        return
+
+    remaining = max(remaining, 0.001)
+    timeouts = request.extensions.get("timeout", {})
+    request.extensions["timeout"] = {
+        name: remaining if value is None else min(value, remaining) for name, value in timeouts.items()
+    }
@@ -0,0 +1,194 @@
+"""
+Request tracing and timing
+"""
+
+import asyncio
+import functools
+import re
+import time
+from typing import Any, Callable
+import uuid
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+import httpx
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.constants import REQUEST_START_HEADER, TRACE_ID_HEADER
+from src.utils.logging import set_trace_id, trace_id_var
+from src.utils.metrics import HTTP_REQUEST_DURATION, HTTP_REQUEST_PHASE_DURATION
+from src.utils.query_budget import query_budget
+from src.utils.request_timing import RequestTiming, get_request_timing, request_timing_var
+
+
+_VALID_TRACE_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _trace_id_from(header: str | None) -> str:
+    if header is not None and _VALID_TRACE_ID.fullmatch(header):
+        return header
+    return uuid.uuid4().hex
+
+
+def _queue_time_from(header: str | None) -> float | None:
+    """
+    Time the request waited in front of the app, from a proxy `X-Request-Start` header
+    in seconds, milliseconds or microseconds since the epoch, optionally prefixed with `t=`.
+    """
+    if not header:
+        return None
+    try:
+        started = float(header.removeprefix("t="))
+    except ValueError:
+        return None
+
+    if started > 1e14:
+        started /= 1_000_000
+    elif started > 1e11:
+        started /= 1000
+
+    queue_time = time.time() - started
+    # Clock skew between the proxy and this host makes the value meaningless outside a sane range.
+    return queue_time if 0 <= queue_time < 60 else None
+
+
+def _server_timing(timing: RequestTiming) -> str:
+    """`Server-Timing` value summarizing the DB work done before the response started."""
+    elapsed = time.perf_counter() - timing.started
+    return (
+        f'db;dur={timing.db_time * 1000:.1f};desc="{timing.statements} statements, {timing.rows} rows", '
+        f"pool;dur={timing.pool_wait * 1000:.1f}, "
+        f"app;dur={elapsed * 1000:.1f}"
+    )
+
+
+class RequestTimingMiddleware:
+    """
+    Pure ASGI middleware that sets the trace id of every request (from the `X-Request-ID` header or a new one),
+    echoes it in the response and records the request latency per route, split into queue, handler, DB
+    and serialization time. The DB work of the request is checked against the query budget
+    and, when `server_timing_enabled`, summarized in a `Server-Timing` header (off by default,
+    it tells every client how many statements and how much DB time its request cost).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        server_timing_enabled: bool = False,
+        query_budget_exempt_path_prefixes: list[str] | None = None,
+    ) -> None:
+        self.app = app
+        self.server_timing_enabled = server_timing_enabled
+        self.query_budget_exempt_path_prefixes = tuple(query_budget_exempt_path_prefixes or ())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        trace_id = _trace_id_from(headers.get(TRACE_ID_HEADER))
+        queue_time = _queue_time_from(headers.get(REQUEST_START_HEADER))
+        timing = RequestTiming(
+            started=time.perf_counter(),
+            query_budget_enabled=not scope["path"].startswith(self.query_budget_exempt_path_prefixes),
+        )
+        status_code = 500
+
+        async def send_with_trace_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers.append(TRACE_ID_HEADER, trace_id)
+                if self.server_timing_enabled:
+                    response_headers.append("Server-Timing", _server_timing(timing))
+            await send(message)
+
+        trace_token = set_trace_id(trace_id)
+        timing_token = request_timing_var.set(timing)
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            self._record(scope, timing, queue_time, status_code)
+            request_timing_var.reset(timing_token)
+            trace_id_var.reset(trace_token)
+
+    @staticmethod
+    def _record(scope: Scope, timing: RequestTiming, queue_time: float | None, status_code: int) -> None:
+        total = time.perf_counter() - timing.started
+        method = scope["method"]
+        # `scope["route"]` is set by FastAPI once a route matched, its path template keeps the label cardinality low.
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+
+        HTTP_REQUEST_DURATION.labels(method=method, route=route, status=status_code).observe(total)
+        query_budget.report(timing, method, route)
+
+        phases = {
+            "db": timing.db_time,
+            "serialization": timing.serialization_time,
+            "handler": max(total - timing.db_time - timing.serialization_time, 0.0),
+        }
+        if queue_time is not None:
+            phases["queue"] = queue_time
+        for phase, elapsed in phases.items():
+            HTTP_REQUEST_PHASE_DURATION.labels(method=method, route=route, phase=phase).observe(elapsed)
+
+
+def _mark_endpoint_finished() -> None:
+    timing = get_request_timing()
+    if timing is not None:
+        timing.endpoint_finished = time.perf_counter()
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+
+        return async_endpoint
+
+    @functools.wraps(call)
+    def endpoint(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _mark_endpoint_finished()
+
+    return endpoint
+
+
+class TimedAPIRoute(APIRoute):
+    """
+    Route class that marks when the endpoint function returned,
+    so the time FastAPI spends validating and serializing its result is reported as its own phase.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        if self.dependant.call is not None:
+            self.dependant.call = _timed_endpoint(self.dependant.call)
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request: Request) -> Response:
+            response = await route_handler(request)
+            timing = get_request_timing()
+            if timing is not None and timing.endpoint_finished is not None:
+                timing.serialization_time += time.perf_counter() - timing.endpoint_finished
+            return response
+
+        return timed_route_handler
+
+
+async def inject_trace_id(request: httpx.Request) -> None:
+    """httpx request hook propagating the trace id of the current request to outbound calls."""
+    # Outside of a request (startup, background tasks) the variable is unset and nothing is sent.
+    trace_id = trace_id_var.get(None)
+    if trace_id is not None and TRACE_ID_HEADER not in request.headers:
+        request.headers[TRACE_ID_HEADER] = trace_id
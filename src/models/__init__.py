@@ -1,5 +1,6 @@
 # import all models here to get metadata
+from src.models.rate_limits import RateLimitCounter
 from src.models.users import User
 
 
-__all__ = ["User"]
+__all__ = ["RateLimitCounter", "User"]
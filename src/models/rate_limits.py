@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String
+from sqlmodel import Field, SQLModel
+
+
+class RateLimitCounter(SQLModel, table=True):
+    """
+    Fixed-window hit counters of the Postgres rate limit backend.
+    The table is UNLOGGED: a crash only resets the limits, and writes skip the WAL.
+    """
+
+    __tablename__ = "rate_limit_counters"
+    __table_args__ = (
+        Index("ix_rate_limit_counters_expires_at", "expires_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+    key: str = Field(
+        sa_type=String(255),  # type: ignore
+        primary_key=True,
+    )
+    # index of the window, `floor(unix time / window length)`
+    window_start: int = Field(
+        sa_type=BigInteger,  # type: ignore
+        primary_key=True,
+    )
+    count: int = Field(
+        sa_type=Integer,  # type: ignore
+        nullable=False,
+    )
+    expires_at: datetime = Field(
+        sa_type=DateTime(timezone=True),  # type: ignore
+        nullable=False,
+    )
@@ -1,7 +1,7 @@
 # app/models/user.py
 from __future__ import annotations
 
-from sqlalchemy import Boolean, String, text
+from sqlalchemy import Boolean, Index, Integer, String, text
 from sqlmodel import Field
 
 from src.models.base import BaseSQLModel
@@ -13,6 +13,22 @@ class User(BaseSQLModel, table=True):
     """
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Covering indexes for keyset pagination on (created_at, id), see UserRepository.list_users.
+        Index(
+            "ix_users_created_at_id",
+            "created_at",
+            "id",
+            postgresql_include=["email", "first_name", "last_name", "is_active"],
+        ),
+        Index(
+            "ix_users_is_active_created_at_id",
+            "is_active",
+            "created_at",
+            "id",
+            postgresql_include=["email", "first_name", "last_name"],
+        ),
+    )
 
     email: str = Field(
         sa_type=String(255),  # type: ignore
@@ -40,6 +56,25 @@ class User(BaseSQLModel, table=True):
             "nullable": False,
         },
     )
+    # grants the admin endpoints: listing, exporting and importing users
+    is_superuser: bool = Field(
+        default=False,
+        sa_type=Boolean,
+        sa_column_kwargs={
+            "server_default": text("false"),
+            "nullable": False,
+        },
+    )
+
+    # bumped to revoke every issued token, access and refresh tokens carry it in the `tv` claim
+    token_version: int = Field(
+        default=0,
+        sa_type=Integer,
+        sa_column_kwargs={
+            "server_default": text("0"),
+            "nullable": False,
+        },
+    )
 
     def __repr__(self) -> str:
         return f"User(id={self.id!r}, email={self.email!r})"
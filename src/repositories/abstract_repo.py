@@ -1,18 +1,31 @@
 from abc import ABC, abstractmethod
+from typing import Any, Generic, Sequence, TypeVar
 
+from src.utils.pagination import Cursor
 
-class AbstractRepository(ABC):
+
+ModelT = TypeVar("ModelT")
+
+
+class AbstractRepository(ABC, Generic[ModelT]):
     @abstractmethod
-    async def add(self) -> None: ...
+    async def add(self, values: dict[str, Any]) -> ModelT: ...
 
     @abstractmethod
-    async def get_one(self) -> None: ...
+    async def get_one(self, **filters: Any) -> ModelT | None: ...
 
     @abstractmethod
-    async def get_list(self) -> None: ...
+    async def get_list(
+        self,
+        *,
+        filters: dict[str, Any] | None = None,
+        columns: Sequence[str] | None = None,
+        after: Cursor | None = None,
+        limit: int = 50,
+    ) -> Any: ...
 
     @abstractmethod
-    async def update(self) -> None: ...
+    async def update(self, entity_id: int, values: dict[str, Any]) -> ModelT | None: ...
 
     @abstractmethod
-    async def delete(self) -> None: ...
+    async def delete(self, entity_id: int) -> bool: ...
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from typing import Any, Generic, Sequence, TypeVar
+
+from sqlalchemy import Integer, any_, bindparam, column, delete, insert, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+
+from src.config.database import execute_with_reconnect
+from src.models.base import BaseSQLModel
+from src.repositories.abstract_repo import AbstractRepository
+from src.utils.pagination import Cursor
+
+
+ModelT = TypeVar("ModelT", bound=BaseSQLModel)
+
+
+@dataclass
+class Page(Generic[ModelT]):
+    # Model instances, or plain dicts when the list was requested with a column projection.
+    items: list[Any]
+    next_cursor: Cursor | None
+
+
+class SQLModelRepository(AbstractRepository[ModelT]):
+    """
+    Generic async CRUD repository for `BaseSQLModel` tables.
+
+    Writes use `RETURNING` instead of refresh round trips, bulk operations run as a single statement,
+    and lists are paginated by keyset on `(created_at, id)`, so deep pages cost the same as the first one.
+    """
+
+    model: type[ModelT]
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _execute(self, stmt: Executable, params: Any = None) -> Any:
+        return await execute_with_reconnect(self.session, stmt, params)
+
+    async def add(self, values: dict[str, Any]) -> ModelT:
+        stmt = insert(self.model).values(**values).returning(self.model)
+        result = await self._execute(stmt)
+        entity = result.scalar_one()
+        await self.session.commit()
+        return entity
+
+    async def get_one(self, **filters: Any) -> ModelT | None:
+        stmt = select(self.model).filter_by(**filters)
+        result = await self._execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_list(
+        self,
+        *,
+        filters: dict[str, Any] | None = None,
+        columns: Sequence[str] | None = None,
+        after: Cursor | None = None,
+        limit: int = 50,
+    ) -> Page:
+        """
+        Return one page ordered by `(created_at, id)` starting after the `after` cursor.
+        With `columns`, only those columns (plus the cursor columns) are selected and items are dicts.
+        """
+        order_by = (self.model.created_at, self.model.id)
+
+        if columns:
+            names = list(dict.fromkeys([*columns, "created_at", "id"]))
+            stmt = select(*(getattr(self.model, name) for name in names))
+        else:
+            stmt = select(self.model)
+
+        stmt = stmt.filter_by(**(filters or {}))
+        if after is not None:
+            stmt = stmt.where(tuple_(*order_by) > tuple_(*after))
+        # One extra row tells whether there is a next page without a COUNT query.
+        stmt = stmt.order_by(*order_by).limit(limit + 1)
+
+        result = await self._execute(stmt)
+        items: list[Any] = [dict(row) for row in result.mappings()] if columns else list(result.scalars())
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = (last["created_at"], last["id"]) if columns else (last.created_at, last.id)
+
+        return Page(items=items, next_cursor=next_cursor)
+
+    async def update(self, entity_id: int, values: dict[str, Any]) -> ModelT | None:
+        stmt = update(self.model).where(self.model.id == entity_id).values(**values).returning(self.model)
+        result = await self._execute(stmt)
+        entity = result.scalar_one_or_none()
+        await self.session.commit()
+        return entity
+
+    async def delete(self, entity_id: int) -> bool:
+        stmt = delete(self.model).where(self.model.id == entity_id).returning(self.model.id)
+        result = await self._execute(stmt)
+        deleted = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        return deleted
+
+    async def bulk_add(self, rows: list[dict[str, Any]]) -> list[ModelT]:
+        if not rows:
+            return []
+
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        result = await self._execute(stmt, rows)
+        entities = list(result.scalars())
+        await self.session.commit()
+        return entities
+
+    async def bulk_update(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Update many rows with per-row values in one `UPDATE ... FROM (VALUES ...)` statement.
+        Every row must contain `id` and the same set of columns.
+        """
+        if not rows:
+            return 0
+
+        table = self.model.__table__  # type: ignore[attr-defined]
+        names = [name for name in rows[0] if name != "id"]
+
+        data = values(
+            column("id", Integer),
+            *(column(name, table.c[name].type) for name in names),
+            name="data",
+        ).data([(row["id"], *(row[name] for name in names)) for row in rows])
+
+        stmt = (
+            update(table)
+            .where(table.c.id == data.c.id)
+            .values({name: data.c[name] for name in names})
+            .returning(table.c.id)
+        )
+        result = await self._execute(stmt)
+        updated = len(result.all())
+        await self.session.commit()
+        return updated
+
+    async def bulk_delete(self, entity_ids: list[int]) -> int:
+        if not entity_ids:
+            return 0
+
+        table = self.model.__table__  # type: ignore[attr-defined]
+        entity_ids_param = bindparam("entity_ids", type_=ARRAY(Integer))
+        stmt = delete(table).where(table.c.id == any_(entity_ids_param)).returning(table.c.id)
+        result = await self._execute(stmt, {"entity_ids": entity_ids})
+        deleted = len(result.all())
+        await self.session.commit()
+        return deleted
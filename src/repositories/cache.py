@@ -0,0 +1,196 @@
+from abc import ABC, abstractmethod
+import time
+from typing import Any, Iterable
+
+import orjson
+
+from src.config.config import settings
+from src.utils.cache import LRUCache
+
+
+class AbstractUserCache(ABC):
+    """
+    Cache of user rows used by `UserRepository`.
+    Values are plain column snapshots, so every caller gets its own `User` instance.
+
+    Read-through fills take `generation()` before their SELECT and pass it to `set`, which drops the row
+    if the user was invalidated since: the row may predate the change the invalidation announced.
+    """
+
+    def generation(self) -> int:
+        """Invalidation counter to read before loading a row that will be passed to `set`."""
+        return 0
+
+    @abstractmethod
+    def get_by_id(self, user_id: int) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def get_by_email(self, email: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def set(self, user_data: dict[str, Any], generation: int | None = None) -> None:
+        """Store a row. With `generation`, the row is dropped if the user was invalidated after it."""
+
+    @abstractmethod
+    def invalidate(self, user_id: int | None = None, emails: Iterable[str] = ()) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def record_invalidation_lag(self, lag_seconds: float) -> None:
+        """Record the delay between a row change in Postgres and its invalidation in this worker."""
+
+    def stats(self) -> dict[str, float]:
+        return {}
+
+
+class NullUserCache(AbstractUserCache):
+    def get_by_id(self, user_id: int) -> dict[str, Any] | None:
+        return None
+
+    def get_by_email(self, email: str) -> dict[str, Any] | None:
+        return None
+
+    def set(self, user_data: dict[str, Any], generation: int | None = None) -> None:
+        pass
+
+    def invalidate(self, user_id: int | None = None, emails: Iterable[str] = ()) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryUserCache(AbstractUserCache):
+    """
+    Per-worker TTL/LRU tier. Coherence across workers relies on the `users_changed` notifications,
+    the TTL only bounds staleness if a notification is missed.
+
+    Fills are also refused for `invalidation_grace` seconds after an invalidation, so a replica that
+    hasn't replayed the change yet can't put the old row back.
+    """
+
+    def __init__(self, max_size: int, ttl: float, invalidation_grace: float = 0.0) -> None:
+        self._by_id: LRUCache[int, dict[str, Any]] = LRUCache(max_size=max_size, default_ttl=ttl)
+        self._id_by_email: LRUCache[str, int] = LRUCache(max_size=max_size, default_ttl=ttl)
+
+        # ("id", user_id) / ("email", email) -> (generation, monotonic time) of the key's last invalidation
+        self._invalidated: LRUCache[tuple[str, int | str], tuple[int, float]] = LRUCache(max_size=max_size)
+        self._generation = 0
+        # Fills older than this are refused, older invalidations may have been evicted from `_invalidated`.
+        self._generation_floor = 0
+        self._invalidation_grace = invalidation_grace
+
+        # metrics
+        self._invalidations = 0
+        self._stale_fills = 0
+        self._lag_count = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+
+    def get_by_id(self, user_id: int) -> dict[str, Any] | None:
+        return self._by_id.get(user_id)
+
+    def get_by_email(self, email: str) -> dict[str, Any] | None:
+        user_id = self._id_by_email.get(email)
+        if user_id is None:
+            return None
+
+        user_data = self._by_id.get(user_id)
+        # The email may have been reassigned since the index entry was written.
+        if user_data is None or user_data["email"] != email:
+            self._id_by_email.pop(email)
+            return None
+
+        return user_data
+
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, user_data: dict[str, Any], generation: int | None = None) -> None:
+        if generation is not None and self._is_stale(user_data, generation):
+            self._stale_fills += 1
+            return
+
+        self._by_id.set(user_data["id"], user_data)
+        self._id_by_email.set(user_data["email"], user_data["id"])
+
+    def _is_stale(self, user_data: dict[str, Any], generation: int) -> bool:
+        if generation < self._generation_floor:
+            return True
+
+        now = time.monotonic()
+        for key in (("id", user_data["id"]), ("email", user_data["email"])):
+            invalidated = self._invalidated.get(key)
+            if invalidated is not None:
+                invalidated_generation, invalidated_at = invalidated
+                if invalidated_generation > generation or now - invalidated_at < self._invalidation_grace:
+                    return True
+        return False
+
+    def _mark_invalidated(self, key: tuple[str, int | str]) -> None:
+        evictions = self._invalidated.evictions
+        self._invalidated.set(key, (self._generation, time.monotonic()))
+        if self._invalidated.evictions != evictions:
+            # The evicted key's invalidation is forgotten, refuse every fill that started before now instead.
+            self._generation_floor = self._generation
+
+    def invalidate(self, user_id: int | None = None, emails: Iterable[str] = ()) -> None:
+        self._invalidations += 1
+        self._generation += 1
+        emails = set(emails)
+
+        if user_id is not None:
+            self._mark_invalidated(("id", user_id))
+            user_data = self._by_id.pop(user_id)
+            if user_data is not None:
+                emails.add(user_data["email"])
+
+        for email in emails:
+            self._mark_invalidated(("email", email))
+            self._id_by_email.pop(email)
+
+    def clear(self) -> None:
+        # Called when notifications may have been missed, so no fill that is in flight can be trusted.
+        self._generation += 1
+        self._generation_floor = self._generation
+        self._by_id.clear()
+        self._id_by_email.clear()
+
+    def record_invalidation_lag(self, lag_seconds: float) -> None:
+        self._lag_count += 1
+        self._lag_total += lag_seconds
+        self._lag_max = max(self._lag_max, lag_seconds)
+
+    def stats(self) -> dict[str, float]:
+        by_id = self._by_id.stats()
+        return {
+            "size": by_id["size"],
+            "hits": by_id["hits"],
+            "misses": by_id["misses"],
+            "hit_ratio": by_id["hit_ratio"],
+            "email_hits": self._id_by_email.hits,
+            "email_misses": self._id_by_email.misses,
+            "invalidations": self._invalidations,
+            "stale_fills": self._stale_fills,
+            "invalidation_lag_avg_seconds": self._lag_total / self._lag_count if self._lag_count else 0.0,
+            "invalidation_lag_max_seconds": self._lag_max,
+        }
+
+
+user_cache: AbstractUserCache = (
+    InMemoryUserCache(
+        max_size=settings.USER_CACHE_SIZE,
+        ttl=settings.USER_CACHE_TTL_SECONDS,
+        invalidation_grace=settings.USER_CACHE_INVALIDATION_GRACE_SECONDS,
+    )
+    if settings.USER_CACHE_ENABLED
+    else NullUserCache()
+)
+
+
+def handle_users_changed(payload: str) -> None:
+    """Invalidate the user from a `users_changed` notification sent by the users table trigger."""
+    data = orjson.loads(payload)
+    user_cache.invalidate(user_id=data["id"], emails=[email for email in data["emails"] if email])
+    user_cache.record_invalidation_lag(max(time.time() - data["ts"], 0.0))
@@ -1,25 +1,139 @@
-from sqlalchemy import select
+from typing import Any
+
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config.config import settings
+from src.config.database import USE_PRIMARY, Database, execute_with_reconnect, reads_from_replica
 from src.models import User
+from src.repositories.base import Page, SQLModelRepository
+from src.repositories.cache import AbstractUserCache, user_cache
+from src.utils.batch_loader import BatchLoader
+from src.utils.pagination import Cursor
+
+
+def create_user_loader(database: Database, cache: AbstractUserCache = user_cache) -> BatchLoader[int, dict[str, Any]]:
+    """
+    Shared loader coalescing concurrent `UserRepository.get_by_id` lookups into batched queries on `database`.
+    Loaded users are stored in `cache` by the batch, which knows when its SELECT started.
+    """
+
+    async def load_users_by_ids(user_ids: list[int]) -> dict[int, dict[str, Any]]:
+        generation = cache.generation()
+        # A single `= ANY($1)` statement whatever the batch size, so it is prepared once per connection.
+        stmt = select(User).where(User.id == any_(bindparam("user_ids", type_=ARRAY(Integer))))
+        async with database.get_async_session() as session:
+            result = await execute_with_reconnect(session, stmt, {"user_ids": user_ids})
+            users = {user.id: user.model_dump() for user in result.scalars()}
+
+        # Ids missing on a lagging replica may be users created a moment ago, confirm them on the primary.
+        missing_ids = [user_id for user_id in user_ids if user_id not in users]
+        if missing_ids and database.replica_engines:
+            async with database.get_async_session(use_primary=True) as session:
+                result = await session.execute(stmt, {"user_ids": missing_ids})
+                users |= {user.id: user.model_dump() for user in result.scalars()}
+
+        for user_data in users.values():
+            cache.set(user_data, generation)
+        return users
 
+    return BatchLoader(load_users_by_ids, max_batch_size=settings.USER_BATCH_LOADER_MAX_BATCH_SIZE)
 
-class UserRepository:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+
+class UserRepository(SQLModelRepository[User]):
+    model = User
+
+    # Columns served by the covering `ix_users_*_created_at_id` indexes, so listing is an index-only scan.
+    LIST_COLUMNS = ("email", "first_name", "last_name", "is_active")
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: AbstractUserCache = user_cache,
+        loader: BatchLoader[int, dict[str, Any]] | None = None,
+    ):
+        super().__init__(session)
+        self.cache = cache
+        self.loader = loader
 
     async def get_by_email(self, email: str) -> User | None:
+        cached = self.cache.get_by_email(email)
+        if cached is not None:
+            return self._from_cache(cached)
+
+        generation = self.cache.generation()
         stmt = select(User).where(User.email == email)
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        result = await self._execute(stmt)
+        user = result.scalar_one_or_none()
+
+        # A user created a moment ago may not have reached the replica yet, confirm the miss on the primary.
+        if user is None and reads_from_replica(self.session):
+            self.session.info[USE_PRIMARY] = True
+            result = await self._execute(stmt)
+            user = result.scalar_one_or_none()
+
+        return self._store(user, generation)
 
     async def get_by_id(self, user_id: int) -> User | None:
+        cached = self.cache.get_by_id(user_id)
+        if cached is not None:
+            return self._from_cache(cached)
+
+        # Lookups outside a transaction are coalesced with concurrent requests.
+        # Once the session has done work, read through it to see its own writes.
+        if self.loader is not None and settings.USER_BATCH_LOADER_ENABLED and not self.session.in_transaction():
+            user_data = await self.loader.load(user_id)
+            return self._from_cache(user_data) if user_data is not None else None
+
+        generation = self.cache.generation()
         stmt = select(User).where(User.id == user_id)
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        result = await self._execute(stmt)
+        return self._store(result.scalar_one_or_none(), generation)
+
+    async def list_users(self, is_active: bool | None, after: Cursor | None, limit: int) -> Page:
+        filters = {"is_active": is_active} if is_active is not None else None
+        return await self.get_list(filters=filters, columns=self.LIST_COLUMNS, after=after, limit=limit)
+
+    async def update_password(self, user_id: int, hashed_password: str) -> User | None:
+        user = await self.update(user_id, {"hashed_password": hashed_password})
+        # Other workers drop their copies on the `users_changed` notification, this one doesn't wait for it.
+        if user is not None:
+            self.cache.invalidate(user_id, emails=[user.email])
+        return user
+
+    def is_known_email(self, email: str) -> bool:
+        """Cheap existence check against the cache only, `False` means unknown rather than free."""
+        return self.cache.get_by_email(email) is not None
 
-    async def create(self, user: User) -> User:
-        self.session.add(user)
+    async def create_if_not_exists(self, user: User) -> User | None:
+        """
+        Insert the user in one `INSERT ... ON CONFLICT (email) DO NOTHING RETURNING` round trip.
+        Returns `None` when the email is taken, with no race window between the check and the insert.
+        """
+        stmt = (
+            pg_insert(User)
+            .values(**user.model_dump(exclude_unset=True))
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.id, User.created_at, User.updated_at, User.is_active)
+        )
+        result = await self._execute(stmt)
+        row = result.one_or_none()
         await self.session.commit()
-        await self.session.refresh(user)
+
+        if row is None:
+            return None
+
+        user.id, user.created_at, user.updated_at, user.is_active = row
+        self._store(user)
         return user
+
+    def _store(self, user: User | None, generation: int | None = None) -> User | None:
+        if user is not None:
+            self.cache.set(user.model_dump(), generation)
+        return user
+
+    @staticmethod
+    def _from_cache(user_data: dict[str, Any]) -> User:
+        # Cached users are detached copies, `session.merge` them before modifying.
+        return User(**user_data)
@@ -52,3 +52,45 @@ class RefreshTokenRequestSchema(BaseModel):
 
 class UserJwtSchema(RefreshTokenRequestSchema):
     access_token: str
+
+
+class UserListItemSchema(BaseModel):
+    """
+    User schema for listing.
+    """
+
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    is_active: bool
+    created_at: datetime
+
+
+class UserPageSchema(BaseModel):
+    """
+    One page of users, pass `next_cursor` back as `cursor` to get the next one.
+    """
+
+    items: list[UserListItemSchema]
+    next_cursor: str | None
+
+
+class UserImportErrorSchema(BaseModel):
+    row: int
+    email: str | None
+    error: str
+
+
+class UserImportReportSchema(BaseModel):
+    """
+    Result of a bulk users import.
+    """
+
+    total_rows: int
+    inserted: int
+    duplicates: int
+    failed: int
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: list[UserImportErrorSchema]
@@ -0,0 +1,57 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Iterable, Literal, Sequence
+
+import orjson
+from sqlalchemy import select
+
+from src.config.database import Database
+from src.models import User
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_COLUMNS = ("id", "email", "first_name", "last_name", "is_active", "created_at", "updated_at")
+
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class UserExportService:
+    """
+    Streams the users table through a server-side cursor.
+    Rows are fetched and serialized `batch_size` at a time, so memory stays bounded whatever the table size,
+    and the cursor only advances as fast as the consumer reads the chunks.
+    """
+
+    def __init__(self, database: Database, batch_size: int = 1000):
+        self.database = database
+        self.batch_size = batch_size
+
+    async def stream(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        table = User.__table__  # type: ignore[attr-defined]
+        stmt = (
+            select(*(table.c[name] for name in EXPORT_COLUMNS))
+            .order_by(table.c.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+
+        if export_format == "csv":
+            yield self._to_csv([EXPORT_COLUMNS])
+
+        async with self.database.get_connection(readonly=True) as conn:
+            result = await conn.stream(stmt)
+            async for rows in result.partitions():
+                if export_format == "csv":
+                    yield self._to_csv(rows)
+                else:
+                    yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+    @staticmethod
+    def _to_csv(rows: Iterable[Sequence[Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+        return buffer.getvalue().encode()
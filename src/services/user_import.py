@@ -0,0 +1,248 @@
+import asyncio
+import csv
+import time
+from typing import AsyncIterator, Literal
+
+import asyncpg
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.config.database import Database
+from src.exceptions.app_exceptions import PasswordHashingPoolSaturatedError
+from src.schemas.users import UserCreateRequestSchema, UserImportErrorSchema, UserImportReportSchema
+from src.utils.password_hashing import PasswordHasher, password_hasher
+
+
+ImportFormat = Literal["ndjson", "csv"]
+
+STAGING_COLUMNS = ["row_number", "email", "hashed_password", "first_name", "last_name"]
+
+CREATE_STAGING_TABLE = """
+CREATE TEMP TABLE users_import (
+    row_number integer NOT NULL,
+    email varchar(255) NOT NULL,
+    hashed_password varchar(255) NOT NULL,
+    first_name varchar(255) NOT NULL,
+    last_name varchar(255) NOT NULL
+) ON COMMIT DROP
+"""
+
+MERGE_STAGING_TABLE = """
+INSERT INTO users (email, hashed_password, first_name, last_name)
+SELECT email, hashed_password, first_name, last_name
+FROM users_import
+ON CONFLICT (email) DO NOTHING
+RETURNING email
+"""
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[bytes | None]:
+    """
+    Split a byte stream into lines. A line longer than `max_line_bytes` is yielded once as `None` and the rest
+    of it is dropped up to the next newline, so a line without newlines can't buffer the whole upload.
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if skipping:
+                # The tail of an oversized line, it was already reported.
+                skipping = False
+                continue
+            yield line if len(line) <= max_line_bytes else None
+
+        if len(buffer) > max_line_bytes:
+            if not skipping:
+                yield None
+                skipping = True
+            buffer = b""
+
+    if buffer and not skipping:
+        yield buffer
+
+
+async def _driver_connection(conn: AsyncConnection) -> asyncpg.Connection:
+    connection = (await conn.get_raw_connection()).driver_connection
+    assert connection is not None
+    return connection
+
+
+class UserImportService:
+    """
+    Bulk users import.
+
+    Input is parsed as a stream, passwords are hashed in chunks across the hashing pool,
+    and each batch is loaded with `COPY` into a temp staging table and merged into `users` with `ON CONFLICT`.
+
+    At most `max_chunks_in_flight` chunks are submitted to the hasher at once. The API shares its pool with
+    logins and signups, so the default of 1 leaves the other pool processes to interactive requests.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        hasher: PasswordHasher = password_hasher,
+        batch_size: int = 1000,
+        hash_chunk_size: int = 32,
+        max_chunks_in_flight: int = 1,
+        max_line_bytes: int = 64 * 1024,
+    ):
+        self.database = database
+        self.hasher = hasher
+        self.batch_size = batch_size
+        self.hash_chunk_size = hash_chunk_size
+        self._hash_slots = asyncio.Semaphore(max_chunks_in_flight)
+        self.max_line_bytes = max_line_bytes
+
+    async def import_users(self, chunks: AsyncIterator[bytes], import_format: ImportFormat) -> UserImportReportSchema:
+        started = time.perf_counter()
+        total_rows = inserted = duplicates = 0
+        errors: list[UserImportErrorSchema] = []
+
+        batch: list[tuple[int, UserCreateRequestSchema]] = []
+        async for row_number, row, error in self._parse(chunks, import_format):
+            total_rows += 1
+            if error is not None:
+                errors.append(UserImportErrorSchema(row=row_number, email=None, error=error))
+                continue
+
+            try:
+                batch.append((row_number, UserCreateRequestSchema.model_validate(row)))
+            except ValidationError as e:
+                email = row.get("email") if isinstance(row, dict) else None
+                errors.append(UserImportErrorSchema(row=row_number, email=email, error=str(e.errors()[0]["msg"])))
+
+            if len(batch) >= self.batch_size:
+                batch_inserted, batch_errors = await self._load_batch(batch)
+                inserted += batch_inserted
+                duplicates += len(batch_errors)
+                errors.extend(batch_errors)
+                batch = []
+
+        if batch:
+            batch_inserted, batch_errors = await self._load_batch(batch)
+            inserted += batch_inserted
+            duplicates += len(batch_errors)
+            errors.extend(batch_errors)
+
+        elapsed = time.perf_counter() - started
+        return UserImportReportSchema(
+            total_rows=total_rows,
+            inserted=inserted,
+            duplicates=duplicates,
+            failed=len(errors) - duplicates,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(total_rows / elapsed, 1) if elapsed else 0.0,
+            errors=sorted(errors, key=lambda error: error.row),
+        )
+
+    async def _parse(
+        self, chunks: AsyncIterator[bytes], import_format: ImportFormat
+    ) -> AsyncIterator[tuple[int, dict, str | None]]:
+        """Yield `(row number, row, error)`, rows that can't be decoded come with an error and an empty row."""
+        header: list[str] | None = None
+        row_number = 0
+
+        async for raw_line in _iter_lines(chunks, self.max_line_bytes):
+            if raw_line is None:
+                row_number += 1
+                yield row_number, {}, f"Row is longer than {self.max_line_bytes} bytes"
+                continue
+
+            if not raw_line.strip():
+                continue
+
+            try:
+                line = raw_line.decode()
+            except UnicodeDecodeError:
+                row_number += 1
+                yield row_number, {}, "Row is not valid UTF-8"
+                continue
+
+            if import_format == "csv":
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [value.strip() for value in values]
+                    continue
+                row_number += 1
+                yield row_number, dict(zip(header, values)), None
+            else:
+                row_number += 1
+                try:
+                    row = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    row = None
+                if isinstance(row, dict):
+                    yield row_number, row, None
+                else:
+                    yield row_number, {}, "Row is not a valid JSON object"
+
+    async def _hash_chunk(self, passwords: list[str]) -> list[str]:
+        async with self._hash_slots:
+            while True:
+                try:
+                    return await self.hasher.hash_many(passwords)
+                except PasswordHashingPoolSaturatedError:
+                    # Interactive requests filled the hasher's queue, back off until they drain instead of failing.
+                    await asyncio.sleep(0.05)
+
+    async def _load_batch(self, batch: list[tuple[int, UserCreateRequestSchema]]) -> tuple[int, list]:
+        # Don't spend argon2 time on emails that already exist or repeat within the batch.
+        existing = await self._find_existing_emails([user.email for _, user in batch])
+        errors: list[UserImportErrorSchema] = []
+        unique: list[tuple[int, UserCreateRequestSchema]] = []
+        for row_number, user in batch:
+            if user.email in existing:
+                errors.append(UserImportErrorSchema(row=row_number, email=user.email, error="User already exists"))
+                continue
+            existing.add(user.email)
+            unique.append((row_number, user))
+
+        if not unique:
+            return 0, errors
+
+        # Hashing happens before a connection is checked out, so it doesn't pin one for seconds.
+        # The chunks queue on `_hash_slots` rather than all landing in the shared pool at once.
+        passwords = [user.password for _, user in unique]
+        hashed_chunks = await asyncio.gather(
+            *(
+                self._hash_chunk(passwords[i : i + self.hash_chunk_size])
+                for i in range(0, len(passwords), self.hash_chunk_size)
+            )
+        )
+        hashed_passwords = [hashed for chunk in hashed_chunks for hashed in chunk]
+
+        records = [
+            (row_number, user.email, hashed_password, *user.full_name.split())
+            for (row_number, user), hashed_password in zip(unique, hashed_passwords)
+        ]
+        inserted_emails = await self._copy_and_merge(records)
+
+        # Emails inserted concurrently by someone else since the existence check lose the conflict.
+        errors.extend(
+            UserImportErrorSchema(row=row_number, email=user.email, error="User already exists")
+            for row_number, user in unique
+            if user.email not in inserted_emails
+        )
+
+        return len(inserted_emails), errors
+
+    async def _find_existing_emails(self, emails: list[str]) -> set[str]:
+        async with self.database.get_connection() as conn:
+            connection = await _driver_connection(conn)
+            records = await connection.fetch("SELECT email FROM users WHERE email = ANY($1::varchar[])", emails)
+        return {record["email"] for record in records}
+
+    async def _copy_and_merge(self, records: list[tuple]) -> set[str]:
+        async with self.database.get_connection() as conn:
+            connection = await _driver_connection(conn)
+            async with connection.transaction():
+                await connection.execute(CREATE_STAGING_TABLE)
+                await connection.copy_records_to_table("users_import", records=records, columns=STAGING_COLUMNS)
+                merged = await connection.fetch(MERGE_STAGING_TABLE)
+            # Under a request deadline the block above is a savepoint of the connection's transaction.
+            await conn.commit()
+        return {record["email"] for record in merged}
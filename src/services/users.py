@@ -1,50 +1,97 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.config.config import settings
+from src.config.database import Database
 from src.models import User
 from src.repositories.users import UserRepository
-from src.schemas.users import UserCreateRequestSchema, UserJwtSchema
+from src.schemas.users import UserCreateRequestSchema, UserJwtSchema, UserListItemSchema, UserPageSchema
+from src.utils.batch_loader import BatchLoader
+from src.utils.deadline import deadline_var
 from src.utils.jwt import JWTService
-from src.utils.password_hashing import hash_password, verify_password
+from src.utils.logging import logger
+from src.utils.pagination import decode_cursor, encode_cursor
+from src.utils.password_hashing import password_hasher, pwd_context
+from src.utils.request_timing import request_timing_var
+
+
+# Strong references to the running background rehashes, the event loop only keeps weak ones.
+_rehash_tasks: set[asyncio.Task] = set()
 
 
 class UserService:
-    def __init__(self, session: AsyncSession):
-        self.user_repo = UserRepository(session)
+    def __init__(
+        self,
+        session: AsyncSession,
+        database: Database,
+        user_loader: BatchLoader[int, dict[str, Any]] | None = None,
+    ):
+        self.session = session
+        self.database = database
+        self.user_repo = UserRepository(session, loader=user_loader)
 
     async def create_user(self, user_data: UserCreateRequestSchema) -> dict[str, str]:
-        existing_user = await self.user_repo.get_by_email(user_data.email)
-        if existing_user:
+        # Known duplicates are rejected before spending argon2 time, the insert itself is the authoritative check.
+        if self.user_repo.is_known_email(user_data.email):
             raise ValueError("User already exists")
 
         first_name, last_name = user_data.full_name.split()
 
         user = User(
             email=user_data.email,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=await password_hasher.hash(user_data.password),
             first_name=first_name,
             last_name=last_name,
         )
 
-        user = await self.user_repo.create(user)
-
-        access_token = JWTService.create_access_token(user.id)
-        refresh_token = JWTService.create_refresh_token(user.id)
+        created_user = await self.user_repo.create_if_not_exists(user)
+        if not created_user:
+            raise ValueError("User already exists")
 
-        return {"access_token": access_token, "refresh_token": refresh_token}
+        return self._issue_tokens(created_user)
 
     async def get_user_by_token(self, token: str) -> User:
-        payload = JWTService.decode_token(token)
-
-        if payload.get("type") != "access":
-            raise ValueError("Invalid token type")
+        payload = self._decode_access_token(token)
+        return await self._get_user_by_payload(payload)
+
+    async def get_principal_by_token(self, token: str) -> User:
+        """
+        Resolve the current user from the access token claims without touching the DB.
+        The returned user is detached and has no `hashed_password`.
+        Falls back to the DB lookup when claims-only auth is disabled or the token has no usable claims.
+
+        Revocation (`User.token_version`) can't be checked without the row, so a claims-only access token
+        stays usable until it expires. Refreshing it is refused, so that is the access token lifetime at most.
+        """
+        payload = self._decode_access_token(token)
+
+        if not settings.JWT_CLAIMS_ONLY_AUTH or payload.get("ver") != JWTService.CLAIMS_VERSION:
+            return await self._get_user_by_payload(payload)
+
+        if not payload["is_active"]:
+            raise ValueError("User is inactive")
+
+        return User(
+            id=int(payload["sub"]),
+            email=payload["email"],
+            first_name=payload["first_name"],
+            last_name=payload["last_name"],
+            is_active=payload["is_active"],
+            created_at=datetime.fromisoformat(payload["created_at"]),
+        )
 
-        user_id = int(payload["sub"])
-        user = await self.user_repo.get_by_id(user_id)
+    async def list_users(self, is_active: bool | None, cursor: str | None, limit: int) -> UserPageSchema:
+        after = decode_cursor(cursor) if cursor else None
 
-        if not user:
-            raise ValueError("User not found")
+        page = await self.user_repo.list_users(is_active=is_active, after=after, limit=limit)
 
-        return user
+        return UserPageSchema(
+            items=[UserListItemSchema(**item) for item in page.items],
+            next_cursor=encode_cursor(page.next_cursor) if page.next_cursor else None,
+        )
 
     async def refresh_tokens(self, refresh_token: str) -> dict[str, str]:
         payload = JWTService.decode_token(refresh_token)
@@ -57,22 +104,78 @@ class UserService:
 
         if not user or not user.is_active:
             raise ValueError("User not found or inactive")
+        if JWTService.is_revoked(payload, user.token_version):
+            raise ValueError("Token has been revoked")
 
-        new_access = JWTService.create_access_token(user.id)
-        new_refresh = JWTService.create_refresh_token(user.id)
-
-        return {"access_token": new_access, "refresh_token": new_refresh}
+        return self._issue_tokens(user)
 
     async def login(self, email: str, password: str) -> UserJwtSchema:
         user = await self.user_repo.get_by_email(email)
+        # Release the connection before the argon2 verification instead of holding it idle meanwhile.
+        await self.session.close()
 
         if not user or not user.is_active:
             raise ValueError("Invalid email or password")
 
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             raise ValueError("Invalid email or password")
 
-        return UserJwtSchema(
-            access_token=JWTService.create_access_token(user.id),
-            refresh_token=JWTService.create_refresh_token(user.id),
-        )
+        if pwd_context.needs_update(user.hashed_password):
+            task = asyncio.create_task(self._rehash_password(user.id, password), name=f"rehash-password-{user.id}")
+            _rehash_tasks.add(task)
+            task.add_done_callback(_rehash_tasks.discard)
+
+        return UserJwtSchema(**self._issue_tokens(user))
+
+    async def _rehash_password(self, user_id: int, password: str) -> None:
+        """Store a hash with the current argon2 parameters, detached from the login request that triggered it."""
+        # The copied request context would otherwise bound this work by the (possibly finished) request.
+        deadline_var.set(None)
+        request_timing_var.set(None)
+        try:
+            hashed_password = await password_hasher.hash(password)
+            # The request session is closed by now, the rehash gets its own.
+            async with self.database.get_async_session() as session:
+                await UserRepository(session, cache=self.user_repo.cache).update_password(user_id, hashed_password)
+        except Exception:
+            logger.exception("Failed to rehash the password of user %s", user_id)
+            return
+
+        logger.info("Rehashed the password of user %s with the current argon2 parameters.", user_id)
+
+    async def _get_user_by_payload(self, payload: dict) -> User:
+        user_id = int(payload["sub"])
+        user = await self.user_repo.get_by_id(user_id)
+
+        if not user:
+            raise ValueError("User not found")
+        if JWTService.is_revoked(payload, user.token_version):
+            raise ValueError("Token has been revoked")
+
+        return user
+
+    @staticmethod
+    def _decode_access_token(token: str) -> dict:
+        payload = JWTService.decode_token(token)
+
+        if payload.get("type") != "access":
+            raise ValueError("Invalid token type")
+
+        return payload
+
+    @staticmethod
+    def _issue_tokens(user: User) -> dict[str, str]:
+        claims = None
+        if settings.JWT_CLAIMS_ONLY_AUTH:
+            claims = {
+                "email": user.email,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "is_active": user.is_active,
+                "created_at": user.created_at.isoformat(),
+            }
+
+        return {
+            "access_token": JWTService.create_access_token(user.id, user.token_version, claims=claims),
+            "refresh_token": JWTService.create_refresh_token(user.id, user.token_version),
+        }
@@ -0,0 +1,108 @@
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+
+class BatchLoader(Generic[KeyT, ValueT]):
+    """
+    DataLoader-style batching for concurrent lookups.
+
+    Keys requested within one event-loop tick are sent to `batch_fn` together, and identical keys that are
+    already queued or in flight share a single future (singleflight), so N concurrent lookups cost one query.
+    `batch_fn` returns a mapping of the found keys, missing keys resolve to `None`.
+
+    Batches run in an empty context rather than the one of the request that happened to queue the first key,
+    so that request's deadline, timing and query budget don't apply to work done for the others.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[KeyT]], Awaitable[dict[KeyT, ValueT]]],
+        max_batch_size: int = 500,
+    ) -> None:
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._queue: list[KeyT] = []
+        self._in_flight: dict[KeyT, asyncio.Future[ValueT | None]] = {}
+        self._dispatch_scheduled = False
+        self._tasks: set[asyncio.Task] = set()
+
+        # metrics
+        self._loads = 0
+        self._coalesced = 0
+        self._batches = 0
+        self._batched_keys = 0
+
+    async def load(self, key: KeyT) -> ValueT | None:
+        self._loads += 1
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._in_flight[key] = future
+            self._queue.append(key)
+
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+
+        # The future is shared, a cancelled caller must not cancel it for the others.
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+
+        for i in range(0, len(queue), self._max_batch_size):
+            task = asyncio.create_task(
+                self._run_batch(queue[i : i + self._max_batch_size]), context=contextvars.Context()
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: list[KeyT]) -> None:
+        self._batches += 1
+        self._batched_keys += len(keys)
+
+        try:
+            values = await self._batch_fn(keys)
+        except Exception as e:
+            self._resolve(keys, exception=e)
+            return
+        except asyncio.CancelledError:
+            # Settle the shared futures, otherwise every later load of these keys would wait on them forever.
+            self._resolve(keys, exception=RuntimeError("Batch load was cancelled"))
+            raise
+
+        self._resolve(keys, values=values)
+
+    def _resolve(
+        self,
+        keys: list[KeyT],
+        values: dict[KeyT, ValueT] | None = None,
+        exception: BaseException | None = None,
+    ) -> None:
+        for key in keys:
+            future = self._in_flight.pop(key)
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(values.get(key) if values else None)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "loads": self._loads,
+            "coalesced": self._coalesced,
+            "batches": self._batches,
+            "in_flight": len(self._in_flight),
+            "avg_batch_size": self._batched_keys / self._batches if self._batches else 0.0,
+        }
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+import time
+from typing import Generic, Hashable, TypeVar
+
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+
+class LRUCache(Generic[KeyT, ValueT]):
+    """
+    Bounded in-process LRU cache with optional per-entry expiry.
+
+    The cache is meant to be used from a single event loop, so it does no locking.
+    """
+
+    def __init__(self, max_size: int, default_ttl: float | None = None) -> None:
+        self._max_size = max_size
+        self._default_ttl = default_ttl
+        self._data: OrderedDict[KeyT, tuple[ValueT, float | None]] = OrderedDict()
+
+        # metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: KeyT) -> ValueT | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: KeyT, value: ValueT, ttl: float | None = None, expires_at: float | None = None) -> None:
+        """Store a value. `expires_at` is an absolute unix timestamp and wins over `ttl`."""
+        if self._max_size <= 0:
+            return
+
+        if expires_at is None:
+            ttl = ttl if ttl is not None else self._default_ttl
+            expires_at = time.time() + ttl if ttl is not None else None
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: KeyT) -> ValueT | None:
+        entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
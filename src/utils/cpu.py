@@ -0,0 +1,44 @@
+import math
+import os
+from pathlib import Path
+
+
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_CPU_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_CPU_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def _cgroup_cpu_quota() -> float | None:
+    """CPUs granted by the cgroup CFS quota (v2 or v1), None when unlimited or not in a cgroup."""
+    try:
+        if CGROUP_V2_CPU_MAX.exists():
+            quota, period = CGROUP_V2_CPU_MAX.read_text().split()
+            return None if quota == "max" else int(quota) / int(period)
+
+        if CGROUP_V1_CPU_QUOTA.exists():
+            quota_us = int(CGROUP_V1_CPU_QUOTA.read_text())
+            return None if quota_us <= 0 else quota_us / int(CGROUP_V1_CPU_PERIOD.read_text())
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def available_cpus() -> float:
+    """
+    CPUs this process can actually use: the scheduler affinity capped by the container CPU quota.
+    `os.cpu_count()` reports the host CPUs and oversizes pools inside a limited container.
+    """
+    try:
+        cpus: float = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return cpus
+
+
+def available_cpu_count() -> int:
+    """`available_cpus()` rounded up to a whole number of processes, at least 1."""
+    return max(1, math.ceil(available_cpus()))
@@ -0,0 +1,117 @@
+from functools import lru_cache
+import re
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.utils.metrics import (
+    DB_ERRORS,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_OVERFLOW,
+    DB_STATEMENT_DURATION,
+)
+from src.utils.query_budget import EXEMPT_EXECUTION_OPTION, query_budget
+from src.utils.request_timing import get_request_timing
+from src.utils.slow_queries import SlowQueryLog
+
+
+_WHITESPACE = re.compile(r"\s+")
+# `IN ($1::INTEGER, $2::INTEGER)` from expanding parameters, so every list length maps to the same statement
+_TYPE_CAST = r"(?:::[A-Za-z_][\w ]*(?:\(\d+(?:,\s*\d+)?\))?(?:\[\])*)?"
+_PARAMETER_LIST = re.compile(rf"\(\s*\$\d+{_TYPE_CAST}(?:\s*,\s*\$\d+{_TYPE_CAST})*\s*\)")
+_PARAMETER = re.compile(r"\$\d+")
+_MAX_STATEMENT_LENGTH = 200
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(statement: str) -> str:
+    """Collapse a SQL statement into a low-cardinality metrics label."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _PARAMETER_LIST.sub("(?)", statement)
+    statement = _PARAMETER.sub("?", statement)
+    return statement[:_MAX_STATEMENT_LENGTH]
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long every checkout waits for a connection."""
+
+    metrics_label: str = "primary"
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            DB_POOL_CHECKOUT_WAIT.labels(engine=self.metrics_label).observe(elapsed)
+
+            timing = get_request_timing()
+            if timing is not None:
+                timing.add_pool_wait(elapsed)
+
+    def recreate(self) -> QueuePool:
+        # `engine.dispose()` swaps the pool for a recreated one, keep its label.
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label  # type: ignore[attr-defined]
+        return pool
+
+
+def instrument_engine(engine: AsyncEngine, name: str, slow_query_log: SlowQueryLog | None = None) -> None:
+    """Attach pool, statement and error metrics to the engine, and report statement timings to `slow_query_log`."""
+    sync_engine = engine.sync_engine
+
+    if isinstance(sync_engine.pool, InstrumentedAsyncAdaptedQueuePool):
+        sync_engine.pool.metrics_label = name
+
+    def update_pool_gauges(*args: Any) -> None:
+        pool = sync_engine.pool
+        if isinstance(pool, QueuePool):
+            DB_POOL_CHECKED_OUT.labels(engine=name).set(pool.checkedout())
+            DB_POOL_OVERFLOW.labels(engine=name).set(pool.overflow())
+
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def observe_statement(
+        statement: str, parameters: Any, context: Any, elapsed: float, rows: int, failed: bool = False
+    ) -> None:
+        normalized = normalize_statement(statement)
+        DB_STATEMENT_DURATION.labels(engine=name, statement=normalized).observe(elapsed)
+        if slow_query_log is not None:
+            slow_query_log.observe(name, statement, parameters, elapsed, failed=failed)
+
+        timing = get_request_timing()
+        exempt = context is not None and context.execution_options.get(EXEMPT_EXECUTION_OPTION, False)
+        if timing is not None and not exempt:
+            timing.add_statement(normalized, elapsed, rows=rows)
+            # A failed statement already raises, the budget is enforced on the next one.
+            if not failed:
+                query_budget.check(timing, normalized)
+
+    def after_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        observe_statement(statement, parameters, context, elapsed, rows=cursor.rowcount)
+
+    def handle_error(context: ExceptionContext) -> None:
+        # Failed statements, including those cancelled by `statement_timeout`, are often the slowest ones.
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            elapsed = time.perf_counter() - started.pop()
+            if context.statement is not None:
+                observe_statement(
+                    context.statement, context.parameters, context.execution_context, elapsed, rows=0, failed=True
+                )
+        DB_ERRORS.labels(engine=name, error=type(context.original_exception).__name__).inc()
+
+    event.listen(sync_engine, "checkout", update_pool_gauges)
+    event.listen(sync_engine, "checkin", update_pool_gauges)
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(sync_engine, "handle_error", handle_error)
@@ -0,0 +1,14 @@
+from contextvars import ContextVar
+import time
+
+
+# `time.monotonic()` by which the current request must be answered, None outside of requests.
+deadline_var: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+def remaining_time() -> float | None:
+    """Seconds left until the deadline of the current request (negative once it passed), None without one."""
+    deadline = deadline_var.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
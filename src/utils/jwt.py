@@ -1,32 +1,65 @@
 from datetime import datetime, timedelta, timezone
+import hashlib
 
 from jose import JWTError, jwt
 
 from src.config.config import settings
+from src.utils.cache import LRUCache
+
+
+# Verified payloads keyed by the token digest, kept until the token's `exp`.
+decoded_token_cache: LRUCache[bytes, dict] = LRUCache(max_size=settings.JWT_DECODE_CACHE_SIZE)
 
 
 class JWTService:
+    # Version of the user claims embedded into access tokens.
+    # Bump it whenever the claims layout changes, so tokens issued with the old layout fall back to a DB lookup.
+    # Revoking the tokens of one user is `User.token_version`, carried in the `tv` claim.
+    CLAIMS_VERSION: int = 1
+
     @staticmethod
-    def create_access_token(user_id: int) -> str:
+    def create_access_token(user_id: int, token_version: int = 0, claims: dict | None = None) -> str:
         payload = {
             "sub": str(user_id),
             "type": "access",
+            "tv": token_version,
             "exp": datetime.now(tz=timezone.utc) + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
         }
+        if claims:
+            payload |= claims
+            payload["ver"] = JWTService.CLAIMS_VERSION
         return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
     @staticmethod
-    def create_refresh_token(user_id: int) -> str:
+    def create_refresh_token(user_id: int, token_version: int = 0) -> str:
         payload = {
             "sub": str(user_id),
             "type": "refresh",
+            "tv": token_version,
             "exp": datetime.now(tz=timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
         }
         return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
     @staticmethod
     def decode_token(token: str) -> dict:
+        token_digest = hashlib.blake2b(token.encode(), digest_size=32).digest()
+
+        cached = decoded_token_cache.get(token_digest)
+        if cached is not None:
+            return dict(cached)
+
         try:
-            return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         except JWTError:
             raise ValueError("Invalid token")
+
+        # Tokens without `exp` are never cached: there is no point where they could be evicted safely.
+        if isinstance(payload.get("exp"), (int, float)):
+            decoded_token_cache.set(token_digest, payload, expires_at=payload["exp"])
+
+        return dict(payload)
+
+    @staticmethod
+    def is_revoked(payload: dict, user_token_version: int) -> bool:
+        """Whether the token was issued before the user's tokens were revoked, tokens without `tv` predate it."""
+        return payload.get("tv", 0) != user_token_version
@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 from contextvars import ContextVar, Token
+from datetime import datetime, timezone
 import logging
 import logging.config
+import logging.handlers
 import os
-from typing import Any, Sequence
+import queue
+import random
+from typing import Any, Literal, Sequence, TextIO
 
+import orjson
 import uvicorn.logging
 
 from src.config.config import settings
@@ -39,42 +44,169 @@ class SingleLineFormatter(uvicorn.logging.DefaultFormatter):
         return res
 
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, serialized with orjson so quotes and newlines in messages are escaped."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        document: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "body": record.getMessage(),
+            "log.logger": record.name,
+            "metadata": {
+                "process": record.process,
+                "path": record.pathname,
+                "trace_id": getattr(record, "trace_id", None),
+            },
+        }
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            document["exception"] = record.exc_text
+        if record.stack_info:
+            document["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(document, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a `rate` share of records below `min_level`, e.g. to thin out access logs under load."""
+
+    def __init__(self, rate: float = 1.0, min_level: int | str = logging.WARNING) -> None:
+        super().__init__()
+        self.rate = rate
+        self.min_level = min_level if isinstance(min_level, int) else logging.getLevelNamesMapping()[min_level]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.min_level or self.rate >= 1 or random.random() < self.rate
+
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Waits for room instead of failing when the queue is full, the sentinel must not be dropped.
+        self.queue.put(self._sentinel)  # type: ignore[attr-defined]
+
+    def stop(self) -> None:
+        if self._thread is not None:  # type: ignore[attr-defined]
+            super().stop()
+
+
+_queue_handlers: list[BoundedQueueHandler] = []
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a bounded in-memory queue and writes them to the stream from a listener thread,
+    so a logging call never waits on stdout/stderr.
+
+    With the "drop" policy records below WARNING are discarded (and counted) while the queue is full,
+    with "block" every logging call waits for free space, slowing the app down to the writer's pace.
+    The formatter set by `dictConfig` belongs to the stream handler and runs in the listener thread.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        max_size: int = 10_000,
+        policy: Literal["drop", "block"] = "drop",
+    ) -> None:
+        self.queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=max_size)
+        super().__init__(self.queue)
+        self.policy = policy
+        self.dropped = 0
+        self.sink = logging.StreamHandler(stream)
+        self.listener: logging.handlers.QueueListener = _DrainingQueueListener(
+            self.queue, self.sink, respect_handler_level=True
+        )
+        self.listener.start()
+        _queue_handlers.append(self)
+
+    def setFormatter(self, fmt: logging.Formatter | None) -> None:
+        self.sink.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments now, they may be mutated after the call returns; formatting is left to the sink.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == "block" or record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Emitting already holds the handler lock.
+            self.dropped += 1
+
+    def stats(self) -> dict[str, float]:
+        return {"queued": self.queue.qsize(), "dropped": self.dropped}
+
+    def close(self) -> None:
+        # Flushes the queued records before the stream is closed.
+        self.listener.stop()
+        self.sink.close()
+        if self in _queue_handlers:
+            _queue_handlers.remove(self)
+        super().close()
+
+
+def logging_stats() -> dict[str, float]:
+    """Queue depth and dropped records summed over the queue handlers."""
+    stats = {"queued": 0.0, "dropped": 0.0}
+    for handler in _queue_handlers:
+        for key, value in handler.stats().items():
+            stats[key] += value
+    return stats
+
+
 class LoggingConfig:
-    DEFAULT_LOG_FORMAT: str = (
-        "[%(trace_id)s] - [%(levelname)s] - %(message)s"
-        if os.environ.get("LOG_MODE") == "dev"
-        else '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "body": "%(message)s", '
-        '"log.logger": "%(name)s", "metadata": {"process": "%(process)d", "path": "%(pathname)s", '
-        '"trace_id": "%(trace_id)s"}}'
-    )
+    DEFAULT_LOG_FORMAT: str = "[%(trace_id)s] - [%(levelname)s] - %(message)s"
     DEFAULT_LOG_LEVEL: str = "INFO"
 
-    LOG_FORMAT: str = getattr(settings, "LOG_FORMAT", None) or os.environ.get("LOG_FORMAT") or DEFAULT_LOG_FORMAT
+    LOG_FORMAT: str | None = getattr(settings, "LOG_FORMAT", None) or os.environ.get("LOG_FORMAT")
     LOG_LEVEL: str = getattr(settings, "LOG_LEVEL", None) or os.environ.get("LOG_LEVEL") or DEFAULT_LOG_LEVEL
     LOG_MULTILINE_MODE_ENABLED: bool = os.environ.get("LOG_MODE") == "dev"
+    # Structured JSON lines unless running in dev mode or a custom `%`-style format is configured.
+    LOG_JSON_ENABLED: bool = not LOG_MULTILINE_MODE_ENABLED and LOG_FORMAT is None
+
+    QUEUE_HANDLER_OPTIONS: dict[str, Any] = {
+        "()": BoundedQueueHandler,
+        "max_size": settings.LOG_QUEUE_SIZE,
+        "policy": settings.LOG_QUEUE_FULL_POLICY,
+    }
 
     LOGGING_CONFIG: dict[str, Any] = {
         "version": 1,
         "disable_existing_loggers": False,
         "formatters": {
-            "default": {
-                "()": "logging.Formatter",
-                "fmt": LOG_FORMAT,
-            },
-            "single_line": {
-                "()": (SingleLineFormatter if not LOG_MULTILINE_MODE_ENABLED else "logging.Formatter"),
-                "fmt": LOG_FORMAT,
-            },
+            "default": (
+                {"()": JsonFormatter}
+                if LOG_JSON_ENABLED
+                else {"()": "logging.Formatter", "fmt": LOG_FORMAT or DEFAULT_LOG_FORMAT}
+            ),
+            "single_line": (
+                {"()": JsonFormatter}
+                if LOG_JSON_ENABLED
+                else {
+                    "()": (SingleLineFormatter if not LOG_MULTILINE_MODE_ENABLED else "logging.Formatter"),
+                    "fmt": LOG_FORMAT or DEFAULT_LOG_FORMAT,
+                }
+            ),
+        },
+        "filters": {
+            "trace_id": {"()": TraceIdFilter},
+            "access_sampling": {"()": SamplingFilter, "rate": settings.LOG_ACCESS_SAMPLE_RATE},
         },
-        "filters": {"trace_id": {"()": TraceIdFilter}},
         "handlers": {
             "console": {
-                "class": "logging.StreamHandler",
+                **QUEUE_HANDLER_OPTIONS,
                 "formatter": "default",
                 "filters": ["trace_id"],
             },
             "console_single_line": {
-                "class": "logging.StreamHandler",
+                **QUEUE_HANDLER_OPTIONS,
                 "formatter": "single_line",
                 "filters": ["trace_id"],
             },
@@ -98,6 +230,7 @@ class LoggingConfig:
             },
             "uvicorn.access": {
                 "handlers": ["console"],
+                "filters": ["access_sampling"],
                 "level": LOG_LEVEL,
                 "propagate": False,
             },
@@ -0,0 +1,142 @@
+"""
+Prometheus metrics of the app.
+
+With several uvicorn workers set `PROMETHEUS_MULTIPROC_DIR` to an empty directory shared by the workers:
+every worker then writes its samples there and `/metrics` aggregates all of them, whichever worker serves the scrape.
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Callable
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, make_asgi_app, multiprocess
+
+from src.utils.logging import logger
+
+
+MULTIPROCESS_MODE = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# -------- database --------
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, including opening a new one.",
+    ["engine"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond pool_size (negative while the pool isn't full yet), per worker.",
+    ["engine"],
+    multiprocess_mode="liveall",
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Statement execution time by normalized SQL.",
+    ["engine", "statement"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_ERRORS = Counter(
+    "db_errors_total",
+    "Errors raised by the database driver.",
+    ["engine", "error"],
+)
+
+# -------- http --------
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_PHASE_DURATION = Histogram(
+    "http_request_phase_seconds",
+    "Request time by phase: queue (before the app, from X-Request-Start), db, serialization and handler (the rest).",
+    ["method", "route", "phase"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# -------- in-process components (pools, caches, loaders) --------
+# Per worker (a `pid` label in multiprocess mode): the stats mix counters with ratios and averages
+# that can't be summed, aggregate them in PromQL, e.g. `sum(...)` for counters and `avg(...)` for ratios.
+COMPONENT_STATS = Gauge(
+    "app_component_stat",
+    "Snapshot of the stats() values of in-process components, per worker.",
+    ["component", "stat"],
+    multiprocess_mode="liveall",
+)
+
+
+class StatsPublisher:
+    """
+    Periodically copies `stats()` snapshots of in-process components into `COMPONENT_STATS`.
+    Values are published from every worker rather than computed at scrape time,
+    because a scrape is served by a single worker.
+    """
+
+    def __init__(self, sources: dict[str, Callable[[], dict[str, float]]], interval: float = 5.0) -> None:
+        self._sources = sources
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+
+    def publish(self) -> None:
+        for component, stats in self._sources.items():
+            try:
+                snapshot = stats()
+            except Exception:
+                logger.exception("Failed to collect %s stats", component)
+                continue
+            for stat, value in snapshot.items():
+                if isinstance(value, (int, float)):
+                    COMPONENT_STATS.labels(component=component, stat=stat).set(value)
+
+    async def _run(self) -> None:
+        while True:
+            self.publish()
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="stats-publisher")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+def create_metrics_app():
+    """ASGI app serving the metrics, aggregated across workers in multiprocess mode."""
+    if not MULTIPROCESS_MODE:
+        return make_asgi_app()
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return make_asgi_app(registry=registry)
+
+
+def mark_worker_dead() -> None:
+    """Drop the live gauges of this worker from the multiprocess aggregation."""
+    if MULTIPROCESS_MODE:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+
+
+def reset_multiprocess_dir() -> None:
+    """Remove samples left by a previous run, must be called before the workers start."""
+    if MULTIPROCESS_MODE:
+        for path in Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).glob("*.db"):
+            path.unlink()
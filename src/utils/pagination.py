@@ -0,0 +1,24 @@
+import base64
+from datetime import datetime
+
+import orjson
+
+
+# Keyset pagination position: the `(created_at, id)` of the last row of the previous page.
+Cursor = tuple[datetime, int]
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Encode a keyset position into an opaque, URL-safe token."""
+    created_at, entity_id = cursor
+    raw = orjson.dumps([created_at.isoformat(), entity_id])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, entity_id = orjson.loads(raw)
+        return datetime.fromisoformat(created_at), int(entity_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
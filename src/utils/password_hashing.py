@@ -1,9 +1,28 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import time
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
+from src.config.config import settings
+from src.exceptions.app_exceptions import PasswordHashingPoolSaturatedError
+from src.utils.cpu import available_cpu_count
+from src.utils.logging import logger
+
+
+ARGON2_COST_SETTINGS = {
+    "argon2__time_cost": settings.PASSWORD_ARGON2_TIME_COST,
+    "argon2__memory_cost": settings.PASSWORD_ARGON2_MEMORY_COST,
+    "argon2__parallelism": settings.PASSWORD_ARGON2_PARALLELISM,
+}
 
 pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
+    **{name: value for name, value in ARGON2_COST_SETTINGS.items() if value is not None},
 )
 
 
@@ -13,3 +32,126 @@ def hash_password(password: str) -> str:
 
 def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+# Every uvicorn worker has its own pool, a pool per CPU in each of them would run CPUs² argon2 processes.
+DEFAULT_MAX_WORKERS = 2
+
+
+class PasswordHasher:
+    """
+    Runs argon2 hashing and verification in a bounded worker pool, so the CPU-heavy work
+    never blocks the event loop. Calls beyond `max_queue_depth` in-flight operations are
+    rejected immediately instead of piling up behind the pool.
+    """
+
+    def __init__(
+        self,
+        executor_type: str = "process",
+        max_workers: int | None = None,
+        max_queue_depth: int = 64,
+    ) -> None:
+        self._executor_type = executor_type
+        self._max_workers = max_workers or min(DEFAULT_MAX_WORKERS, available_cpu_count())
+        self._max_queue_depth = max_queue_depth
+        self._executor: Executor | None = None
+
+        # metrics
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+
+    def _create_executor(self) -> Executor:
+        if self._executor_type == "process":
+            try:
+                return ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning("Process pool for password hashing is unavailable, falling back to threads: %s", e)
+                self._executor_type = "thread"
+
+        return ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="password-hashing")
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool as e:
+            # Processes start lazily, so a platform that can't run them only fails here, as can a killed worker.
+            if self._executor is executor:
+                logger.warning("Process pool for password hashing is broken, falling back to threads: %s", e)
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor_type = "thread"
+                self._executor = None
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._in_flight >= self._max_queue_depth:
+            self._rejected += 1
+            raise PasswordHashingPoolSaturatedError()
+
+        self._in_flight += 1
+        self._submitted += 1
+        started = time.perf_counter()
+        try:
+            result = await self._submit(func, *args)
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._total_seconds += time.perf_counter() - started
+
+        self._completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hash a chunk of passwords as one pool task, so bulk work pays the IPC overhead once per chunk."""
+        return await self._run(hash_passwords, passwords)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    def stats(self) -> dict[str, float]:
+        finished = self._completed + self._failed
+        return {
+            "max_workers": self._max_workers,
+            "max_queue_depth": self._max_queue_depth,
+            "in_flight": self._in_flight,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "avg_seconds": self._total_seconds / finished if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASHING_EXECUTOR,
+    max_workers=settings.PASSWORD_HASHING_MAX_WORKERS,
+    max_queue_depth=settings.PASSWORD_HASHING_MAX_QUEUE_DEPTH,
+)
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Callable
+
+import asyncpg
+
+from src.config.config import DatabaseSettings
+from src.utils.logging import logger
+
+
+class PostgresNotificationListener:
+    """
+    Keeps a dedicated asyncpg connection LISTENing on a channel and passes every payload to `on_notification`.
+    The connection lives outside the SQLAlchemy pool, so it never takes a slot from request handling.
+    On every (re)connect `on_reconnect` is called, because notifications sent while disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        on_notification: Callable[[str], None],
+        on_reconnect: Callable[[], None] | None = None,
+        keepalive_interval: float = 30.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        self._channel = channel
+        self._on_notification = on_notification
+        self._on_reconnect = on_reconnect
+        self._keepalive_interval = keepalive_interval
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._task: asyncio.Task | None = None
+
+    async def _connect(self) -> asyncpg.Connection:
+        db_settings = DatabaseSettings()
+        return await asyncpg.connect(
+            host=db_settings.listen_host or db_settings.host,
+            port=db_settings.listen_port or db_settings.port,
+            user=db_settings.username,
+            password=db_settings.password,
+            database=db_settings.database,
+        )
+
+    def _handle(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            self._on_notification(payload)
+        except Exception:
+            logger.exception("Failed to handle notification on channel %s", channel)
+
+    async def _listen(self) -> None:
+        delay = self._reconnect_delay
+        while True:
+            try:
+                connection = await self._connect()
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("LISTEN %s: connection failed, retrying in %.1fs: %s", self._channel, delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_reconnect_delay)
+                continue
+
+            try:
+                await connection.add_listener(self._channel, self._handle)
+                if self._on_reconnect is not None:
+                    self._on_reconnect()
+                logger.info("Listening for notifications on channel %s.", self._channel)
+                delay = self._reconnect_delay
+
+                # A keepalive query detects half-open connections that would otherwise drop notifications silently.
+                while True:
+                    await asyncio.sleep(self._keepalive_interval)
+                    await connection.execute("SELECT 1", timeout=self._keepalive_interval)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("LISTEN %s: connection lost, reconnecting: %s", self._channel, e)
+            finally:
+                if not connection.is_closed():
+                    connection.terminate()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(), name=f"pg-listen-{self._channel}")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
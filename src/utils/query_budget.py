@@ -0,0 +1,82 @@
+from typing import Literal
+
+from src.config.config import settings
+from src.utils.logging import logger
+from src.utils.request_timing import RequestTiming
+
+
+# Execution option of bookkeeping statements (the request deadline's statement timeout) that the
+# per-request statement counts, DB time and N+1 detection leave out.
+EXEMPT_EXECUTION_OPTION = "query_budget_exempt"
+
+
+class QueryBudgetExceededError(RuntimeError):
+    pass
+
+
+class QueryBudget:
+    """
+    Per-request limits on the number of statements and DB time, plus N+1 detection by repeated statement shapes.
+    In "log" mode violations are logged once the request finished, in "raise" mode the statement
+    that crosses a limit fails the request.
+    """
+
+    def __init__(
+        self,
+        max_statements: int | None,
+        max_db_time: float | None,
+        repeated_statement_threshold: int,
+        action: Literal["log", "raise"] = "log",
+    ) -> None:
+        self.max_statements = max_statements
+        self.max_db_time = max_db_time
+        self.repeated_statement_threshold = repeated_statement_threshold
+        self.action = action
+
+    def check(self, timing: RequestTiming, statement: str) -> None:
+        """Called after every statement of the request with its normalized text."""
+        if self.action != "raise" or not timing.query_budget_enabled:
+            return
+
+        if self.max_statements is not None and timing.statements > self.max_statements:
+            raise QueryBudgetExceededError(f"Request ran more than {self.max_statements} statements")
+        if self.max_db_time is not None and timing.db_time > self.max_db_time:
+            raise QueryBudgetExceededError(f"Request spent more than {self.max_db_time}s in the database")
+        count = timing.statement_counts[statement]
+        if count >= self.repeated_statement_threshold:
+            raise QueryBudgetExceededError(f"Likely N+1, statement executed {count} times: {statement}")
+
+    def violations(self, timing: RequestTiming) -> list[str]:
+        violations = []
+        if self.max_statements is not None and timing.statements > self.max_statements:
+            violations.append(f"{timing.statements} statements (budget {self.max_statements})")
+        if self.max_db_time is not None and timing.db_time > self.max_db_time:
+            violations.append(f"{timing.db_time:.3f}s in the database (budget {self.max_db_time}s)")
+        for statement, count in timing.statement_counts.items():
+            if count >= self.repeated_statement_threshold:
+                violations.append(f"likely N+1, {count}x: {statement}")
+        return violations
+
+    def report(self, timing: RequestTiming, method: str, route: str) -> None:
+        if not timing.query_budget_enabled:
+            return
+
+        violations = self.violations(timing)
+        if violations:
+            logger.warning(
+                "Query budget exceeded by %s %s (%d statements, %d rows, %.1fms): %s",
+                method,
+                route,
+                timing.statements,
+                timing.rows,
+                timing.db_time * 1000,
+                "; ".join(violations),
+            )
+
+
+query_budget = QueryBudget(
+    max_statements=settings.QUERY_BUDGET_MAX_STATEMENTS,
+    max_db_time=settings.QUERY_BUDGET_MAX_DB_TIME,
+    repeated_statement_threshold=settings.QUERY_BUDGET_REPEATED_STATEMENT_THRESHOLD,
+    action=settings.QUERY_BUDGET_ACTION,
+)
@@ -0,0 +1,165 @@
+from abc import ABC, abstractmethod
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import time
+
+from sqlalchemy import text
+
+from src.config.database import Database
+from src.utils.cache import LRUCache
+from src.utils.logging import logger
+
+
+class AbstractRateLimitBackend(ABC):
+    """
+    Storage of fixed-window hit counters. Limits are enforced over a sliding window estimated from
+    the current and the previous window, so a key costs two counters however many hits it gets.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, window: float) -> tuple[int, int]:
+        """Count a hit for `key` and return the hits of the current and of the previous window."""
+
+    def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, float]:
+        return {}
+
+
+class InMemoryRateLimitBackend(AbstractRateLimitBackend):
+    """Per-worker counters in a bounded LRU, entries expire two windows after their last hit."""
+
+    def __init__(self, max_keys: int) -> None:
+        # key -> (window index, hits in that window, hits in the window before)
+        self._counters: LRUCache[str, tuple[int, int, int]] = LRUCache(max_size=max_keys)
+
+    async def hit(self, key: str, window: float) -> tuple[int, int]:
+        window_index = int(time.time() // window)
+        current, previous = 0, 0
+
+        entry = self._counters.get(key)
+        if entry is not None:
+            entry_index, entry_current, entry_previous = entry
+            if entry_index == window_index:
+                current, previous = entry_current, entry_previous
+            elif entry_index == window_index - 1:
+                previous = entry_current
+
+        current += 1
+        self._counters.set(key, (window_index, current, previous), ttl=2 * window)
+        return current, previous
+
+    def stats(self) -> dict[str, float]:
+        return self._counters.stats()
+
+
+class PostgresRateLimitBackend(AbstractRateLimitBackend):
+    """
+    Counters shared by all workers in the UNLOGGED `rate_limit_counters` table, one round trip per hit.
+    Expired rows are deleted in the background every `cleanup_interval` seconds.
+    """
+
+    HIT_SQL = text(
+        """
+        WITH hit AS (
+            INSERT INTO rate_limit_counters (key, window_start, count, expires_at)
+            VALUES (:key, :window_start, 1, :expires_at)
+            ON CONFLICT (key, window_start) DO UPDATE SET count = rate_limit_counters.count + 1
+            RETURNING count
+        )
+        SELECT
+            (SELECT count FROM hit) AS current,
+            COALESCE(
+                (SELECT count FROM rate_limit_counters WHERE key = :key AND window_start = :window_start - 1), 0
+            ) AS previous
+        """
+    )
+    CLEANUP_SQL = text("DELETE FROM rate_limit_counters WHERE expires_at < now()")
+
+    def __init__(self, database: Database, cleanup_interval: float = 60.0) -> None:
+        self._database = database
+        self._cleanup_interval = cleanup_interval
+        self._task: asyncio.Task | None = None
+
+    async def hit(self, key: str, window: float) -> tuple[int, int]:
+        now = time.time()
+        window_index = int(now // window)
+        params = {
+            "key": key,
+            "window_start": window_index,
+            "expires_at": datetime.fromtimestamp((window_index + 2) * window, tz=timezone.utc),
+        }
+        async with self._database.get_connection() as conn:
+            row = (await conn.execute(self.HIT_SQL, params)).one()
+            await conn.commit()
+        return row.current, row.previous
+
+    async def _cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(self._cleanup_interval)
+            try:
+                async with self._database.get_connection() as conn:
+                    await conn.execute(self.CLEANUP_SQL)
+                    await conn.commit()
+            except Exception as e:
+                logger.warning("Failed to delete expired rate limit counters: %s", e)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._cleanup(), name="rate-limit-cleanup")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    name: str
+    limit: int
+    window: float
+
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter over a pluggable backend, independent of FastAPI so it can back
+    a dependency or a middleware. Rejected attempts are counted as well, so a client hammering
+    a limited key stays limited until it slows down.
+    """
+
+    def __init__(self, backend: AbstractRateLimitBackend) -> None:
+        self.backend = backend
+        self.rejected = 0
+
+    @staticmethod
+    def key(rule: RateLimitRule, value: str) -> str:
+        # Client-supplied values have any length, the digest keeps keys short and the stored counters free of emails.
+        return f"{rule.name}:{hashlib.blake2b(value.encode(), digest_size=16).hexdigest()}"
+
+    async def check(self, rule: RateLimitRule, value: str) -> float | None:
+        """Count a hit of `value` against `rule`, return the seconds to wait when the limit is exceeded."""
+        current, previous = await self.backend.hit(self.key(rule, value), rule.window)
+
+        # Weight the previous window by how much of it still overlaps the sliding window.
+        elapsed = (time.time() % rule.window) / rule.window
+        if previous * (1 - elapsed) + current <= rule.limit:
+            return None
+
+        self.rejected += 1
+        return rule.window * (1 - elapsed)
+
+    def stats(self) -> dict[str, float]:
+        return {"rejected": self.rejected, **self.backend.stats()}
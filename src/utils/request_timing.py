@@ -0,0 +1,40 @@
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RequestTiming:
+    """
+    Time spent in the phases of one request and the statements it ran,
+    filled in by the timing middleware, route class and DB hooks.
+    """
+
+    started: float
+    db_time: float = 0.0
+    endpoint_finished: float | None = None
+    serialization_time: float = 0.0
+    pool_wait: float = 0.0
+    pool_checkouts: int = 0
+    statements: int = 0
+    rows: int = 0
+    # executions per normalized statement, the same shape repeated many times is a likely N+1
+    statement_counts: Counter[str] = field(default_factory=Counter)
+    query_budget_enabled: bool = True
+
+    def add_statement(self, statement: str, elapsed: float, rows: int) -> None:
+        self.db_time += elapsed
+        self.statements += 1
+        self.rows += max(rows, 0)
+        self.statement_counts[statement] += 1
+
+    def add_pool_wait(self, elapsed: float) -> None:
+        self.pool_wait += elapsed
+        self.pool_checkouts += 1
+
+
+request_timing_var: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+def get_request_timing() -> RequestTiming | None:
+    return request_timing_var.get()
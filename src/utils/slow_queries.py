@@ -0,0 +1,150 @@
+import asyncio
+import random
+import re
+import time
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.utils.logging import logger
+
+
+_FUNCTION_CALL = re.compile(r"\b([A-Za-z_][A-Za-z0-9_.]*)\s*\(")
+# Words followed by "(" in generated SQL that aren't function calls.
+_SQL_KEYWORDS = frozenset(
+    "all and any as cast exists filter from in join not on or over select using values where within".split()
+)
+# Functions that don't change anything, so running them a second time under EXPLAIN ANALYZE is harmless.
+_SAFE_FUNCTIONS = frozenset(
+    "array_agg avg coalesce count greatest json_agg json_build_object jsonb_agg jsonb_build_object least length "
+    "lower max min now nullif row_number string_agg sum trim upper".split()
+)
+
+
+def parameter_shape(parameters: Any) -> str:
+    """Types of the bound parameters without their values, which may hold personal data."""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {parameter_shape(value)}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            # executemany: the shape of one row is enough
+            return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+        return "(" + ", ".join(parameter_shape(value) for value in parameters) + ")"
+    if isinstance(parameters, (set, frozenset)):
+        return f"{type(parameters).__name__}[{len(parameters)}]"
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """
+    Logs statements slower than `threshold` with their parameter shape (the trace id is added by the log filter).
+    Statements are timed by the engine instrumentation (`instrument_engine`), which reports them to `observe`.
+
+    A `sample_rate` share of slow SELECTs also gets its plan captured in a background task on `explain_engine`,
+    a separate, unpooled engine pointing to a replica when one exists. Captures are capped at
+    `max_explains_per_minute` and one at a time, and run in a rolled back read-only transaction with
+    a statement timeout, so they never compete with requests for pooled connections.
+
+    EXPLAIN ANALYZE executes the statement again, so it is only used with `analyze` (the engine is a replica)
+    and for statements calling nothing but known side-effect free functions. Other plans are plain EXPLAIN,
+    as are those of failed statements: one cancelled by `statement_timeout` would only time out again.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        explain_engine: AsyncEngine | None = None,
+        sample_rate: float = 0.0,
+        max_explains_per_minute: int = 6,
+        explain_timeout: float = 10.0,
+        analyze: bool = False,
+    ) -> None:
+        self._threshold = threshold
+        self._explain_engine = explain_engine
+        self._sample_rate = sample_rate
+        self._max_explains_per_minute = max_explains_per_minute
+        self._explain_timeout = explain_timeout
+        self._analyze = analyze
+
+        self._explain_times: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def observe(self, engine_name: str, statement: str, parameters: Any, elapsed: float, failed: bool = False) -> None:
+        if elapsed >= self._threshold:
+            self._on_slow_query(engine_name, statement, parameters, elapsed, failed)
+
+    def _on_slow_query(self, engine_name: str, statement: str, parameters: Any, elapsed: float, failed: bool) -> None:
+        logger.warning(
+            "Slow query on %s %s %.1fms: %s | parameters: %s",
+            engine_name,
+            "failed after" if failed else "took",
+            elapsed * 1000,
+            " ".join(statement.split()),
+            parameter_shape(parameters),
+        )
+
+        if self._explain_engine is not None and self._should_explain(statement):
+            # The hook runs on the event loop thread, the capture continues after the request's statement returned.
+            self._task = asyncio.get_running_loop().create_task(
+                self._explain(self._explain_engine, statement, parameters, elapsed, failed), name="slow-query-explain"
+            )
+
+    def _should_explain(self, statement: str) -> bool:
+        if self._task is not None and not self._task.done():
+            return False
+        # Only plain reads are explained, their plans are the ones worth a sample.
+        normalized = statement.lstrip().upper()
+        if not normalized.startswith("SELECT") or " FOR UPDATE" in normalized or " FOR SHARE" in normalized:
+            return False
+        if random.random() >= self._sample_rate:
+            return False
+
+        now = time.monotonic()
+        self._explain_times = [started for started in self._explain_times if now - started < 60]
+        if len(self._explain_times) >= self._max_explains_per_minute:
+            return False
+        self._explain_times.append(now)
+        return True
+
+    def _can_analyze(self, statement: str) -> bool:
+        if not self._analyze:
+            return False
+        functions = {name.lower().rsplit(".", 1)[-1] for name in _FUNCTION_CALL.findall(statement)}
+        return functions <= _SQL_KEYWORDS | _SAFE_FUNCTIONS
+
+    async def _explain(
+        self, engine: AsyncEngine, statement: str, parameters: Any, elapsed: float, failed: bool
+    ) -> None:
+        explain = "EXPLAIN (ANALYZE, BUFFERS)" if not failed and self._can_analyze(statement) else "EXPLAIN"
+        try:
+            async with engine.connect() as conn:
+                # Anything that writes despite the checks above fails instead, and the rollback discards the rest.
+                await conn.execute(text("SET TRANSACTION READ ONLY"))
+                await conn.execute(text(f"SET LOCAL statement_timeout = {int(self._explain_timeout * 1000)}"))
+                result = await conn.exec_driver_sql(f"{explain} {statement}", parameters)
+                plan = "\n".join(row[0] for row in result)
+                await conn.rollback()
+        except Exception as e:
+            logger.warning("Failed to capture the plan of a slow query: %s", e)
+            return
+
+        logger.info(
+            "Plan (%s) of slow query (%.1fms when slow): %s\n%s",
+            explain,
+            elapsed * 1000,
+            " ".join(statement.split()),
+            plan,
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._explain_engine is not None:
+            await self._explain_engine.dispose()
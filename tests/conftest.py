@@ -0,0 +1,16 @@
+import os
+
+
+# Settings are loaded at import time, give the required ones a value so the modules import without a .env file.
+for name, value in {
+    "DB_USERNAME": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_DATABASE": "test",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "REFRESH_TOKEN_EXPIRE_DAYS": "7",
+    "SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,87 @@
+import pytest
+
+from src.middlewares import admission
+from src.middlewares.admission import AdaptiveConcurrencyLimit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_limit(**kwargs) -> AdaptiveConcurrencyLimit:
+    options = {"initial_limit": 10, "min_limit": 2, "max_limit": 20, "target_pool_wait": 0.01} | kwargs
+    return AdaptiveConcurrencyLimit(**options)
+
+
+def test_lower_priorities_are_shed_first():
+    limit = make_limit()
+    for _ in range(6):
+        assert limit.try_acquire("low")
+
+    assert not limit.try_acquire("low")
+    for _ in range(3):
+        assert limit.try_acquire("normal")
+    assert not limit.try_acquire("normal")
+    assert limit.try_acquire("high")
+    assert not limit.try_acquire("high")
+    assert limit.in_flight == 10
+    assert limit.shed == {"high": 1, "normal": 1, "low": 1}
+
+
+def test_slow_pool_checkout_backs_off_once_per_interval(clock):
+    limit = make_limit()
+    for _ in range(3):
+        limit.try_acquire("high")
+
+    limit.release(pool_wait=0.5)
+    limit.release(pool_wait=0.5)
+    assert limit.limit == pytest.approx(9)
+
+    clock[0] += 0.1
+    limit.release(pool_wait=0.5)
+    assert limit.limit == pytest.approx(8.1)
+    assert limit.in_flight == 0
+
+
+def test_backoff_stops_at_min_limit(clock):
+    limit = make_limit(initial_limit=2)
+    for _ in range(5):
+        clock[0] += 1
+        limit.try_acquire("high")
+        limit.release(pool_wait=0.5)
+
+    assert limit.limit == 2
+
+
+def test_limit_grows_only_while_it_is_used():
+    limit = make_limit()
+    limit.try_acquire("high")
+    limit.release(pool_wait=0.0)
+    assert limit.limit == 10
+
+    for _ in range(5):
+        limit.try_acquire("high")
+    limit.release(pool_wait=0.0)
+    assert limit.limit == pytest.approx(10.1)
+
+
+def test_growth_stops_at_max_limit():
+    limit = make_limit(initial_limit=20)
+    for _ in range(20):
+        limit.try_acquire("high")
+    limit.release(pool_wait=0.0)
+
+    assert limit.limit == 20
+
+
+def test_requests_without_database_access_leave_the_limit_alone(clock):
+    limit = make_limit()
+    for _ in range(10):
+        limit.try_acquire("high")
+    limit.release(pool_wait=None)
+
+    assert limit.limit == 10
+    assert limit.in_flight == 9
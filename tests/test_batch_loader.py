@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from src.utils.batch_loader import BatchLoader
+from src.utils.deadline import deadline_var
+from src.utils.request_timing import RequestTiming, request_timing_var
+
+
+class FakeBatch:
+    def __init__(self, values: dict[int, str], error: Exception | None = None) -> None:
+        self.values = values
+        self.error = error
+        self.calls: list[list[int]] = []
+
+    async def __call__(self, keys: list[int]) -> dict[int, str]:
+        self.calls.append(keys)
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return {key: self.values[key] for key in keys if key in self.values}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_batched_and_deduplicated():
+    batch_fn = FakeBatch({1: "one", 2: "two"})
+    loader = BatchLoader(batch_fn)
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3))
+
+    assert results == ["one", "two", "one", None]
+    assert batch_fn.calls == [[1, 2, 3]]
+    assert loader.stats()["coalesced"] == 1
+    assert loader.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_max_batch_size():
+    batch_fn = FakeBatch({i: str(i) for i in range(5)})
+    loader = BatchLoader(batch_fn, max_batch_size=2)
+
+    results = await asyncio.gather(*(loader.load(i) for i in range(5)))
+
+    assert results == ["0", "1", "2", "3", "4"]
+    assert batch_fn.calls == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_are_raised_to_every_caller():
+    loader = BatchLoader(FakeBatch({}, error=RuntimeError("boom")))
+
+    results = await asyncio.gather(loader.load(1), loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert loader.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_keys_are_loaded_again():
+    batch_fn = FakeBatch({1: "one"}, error=RuntimeError("boom"))
+    loader = BatchLoader(batch_fn)
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
+
+    batch_fn.error = None
+    assert await loader.load(1) == "one"
+    assert len(batch_fn.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_settles_its_futures():
+    started = asyncio.Event()
+
+    async def never_returns(keys: list[int]) -> dict[int, str]:
+        started.set()
+        await asyncio.Event().wait()
+        return {}
+
+    loader = BatchLoader(never_returns)
+    load = asyncio.create_task(loader.load(1))
+    await started.wait()
+
+    for task in list(loader._tasks):
+        task.cancel()
+
+    with pytest.raises(RuntimeError, match="cancelled"):
+        await asyncio.wait_for(load, timeout=1)
+    assert loader.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batches_run_outside_the_callers_context():
+    seen: list[object] = []
+
+    async def batch_fn(keys: list[int]) -> dict[int, str]:
+        seen.append((deadline_var.get(), request_timing_var.get()))
+        return {key: str(key) for key in keys}
+
+    loader = BatchLoader(batch_fn)
+    deadline_token = deadline_var.set(123.0)
+    timing_token = request_timing_var.set(RequestTiming(started=0.0))
+    try:
+        assert await loader.load(1) == "1"
+    finally:
+        deadline_var.reset(deadline_token)
+        request_timing_var.reset(timing_token)
+
+    assert seen == [(None, None)]
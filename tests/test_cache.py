@@ -0,0 +1,72 @@
+import pytest
+
+from src.utils import cache
+from src.utils.cache import LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru: LRUCache[str, int] = LRUCache(max_size=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.evictions == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    lru: LRUCache[str, int] = LRUCache(max_size=10, default_ttl=10)
+    lru.set("default", 1)
+    lru.set("long", 2, ttl=60)
+
+    clock[0] += 10
+    assert lru.get("default") is None
+    assert lru.get("long") == 2
+    assert lru.expirations == 1
+    assert len(lru) == 1
+
+
+def test_expires_at_wins_over_ttl(clock):
+    lru: LRUCache[str, int] = LRUCache(max_size=10)
+    lru.set("key", 1, ttl=60, expires_at=clock[0] + 5)
+
+    clock[0] += 5
+    assert lru.get("key") is None
+
+
+def test_zero_size_cache_stores_nothing():
+    lru: LRUCache[str, int] = LRUCache(max_size=0)
+    lru.set("key", 1)
+
+    assert lru.get("key") is None
+    assert len(lru) == 0
+
+
+def test_pop_and_stats():
+    lru: LRUCache[str, int] = LRUCache(max_size=10)
+    lru.set("key", 1)
+    lru.get("key")
+    lru.get("missing")
+
+    assert lru.pop("key") == 1
+    assert lru.pop("key") is None
+    assert lru.stats() == {
+        "size": 0,
+        "max_size": 10,
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+        "evictions": 0,
+        "expirations": 0,
+    }
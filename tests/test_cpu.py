@@ -0,0 +1,52 @@
+import pytest
+
+from src.utils import cpu
+
+
+@pytest.fixture
+def cgroup(monkeypatch, tmp_path):
+    monkeypatch.setattr(cpu, "CGROUP_V2_CPU_MAX", tmp_path / "cpu.max")
+    monkeypatch.setattr(cpu, "CGROUP_V1_CPU_QUOTA", tmp_path / "cpu.cfs_quota_us")
+    monkeypatch.setattr(cpu, "CGROUP_V1_CPU_PERIOD", tmp_path / "cpu.cfs_period_us")
+    return tmp_path
+
+
+def test_no_cgroup(cgroup):
+    assert cpu._cgroup_cpu_quota() is None
+
+
+def test_v2_quota(cgroup):
+    (cgroup / "cpu.max").write_text("150000 100000\n")
+    assert cpu._cgroup_cpu_quota() == 1.5
+
+
+def test_v2_unlimited(cgroup):
+    (cgroup / "cpu.max").write_text("max 100000\n")
+    assert cpu._cgroup_cpu_quota() is None
+
+
+def test_v1_quota(cgroup):
+    (cgroup / "cpu.cfs_quota_us").write_text("50000\n")
+    (cgroup / "cpu.cfs_period_us").write_text("100000\n")
+    assert cpu._cgroup_cpu_quota() == 0.5
+
+
+def test_v1_unlimited(cgroup):
+    (cgroup / "cpu.cfs_quota_us").write_text("-1\n")
+    assert cpu._cgroup_cpu_quota() is None
+
+
+@pytest.mark.parametrize("content", ["", "garbage", "100000"])
+def test_v2_invalid_content(cgroup, content):
+    (cgroup / "cpu.max").write_text(content)
+    assert cpu._cgroup_cpu_quota() is None
+
+
+def test_v1_missing_period(cgroup):
+    (cgroup / "cpu.cfs_quota_us").write_text("50000\n")
+    assert cpu._cgroup_cpu_quota() is None
+
+
+def test_available_cpu_count_is_at_least_one(cgroup):
+    (cgroup / "cpu.max").write_text("10000 100000\n")
+    assert cpu.available_cpu_count() == 1
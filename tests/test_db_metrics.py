@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from src.models.users import User
+from src.utils.db_metrics import instrument_engine, normalize_statement
+from src.utils.metrics import DB_STATEMENT_DURATION
+from src.utils.request_timing import RequestTiming, request_timing_var
+from src.utils.slow_queries import SlowQueryLog
+
+
+def compile_sql(stmt) -> str:
+    """SQL as the asyncpg dialect sends it, with expanding IN lists rendered."""
+    return str(stmt.compile(dialect=postgresql.asyncpg.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+def test_whitespace_is_collapsed():
+    assert normalize_statement("SELECT *\n  FROM users\n\tWHERE id = 1 ") == "SELECT * FROM users WHERE id = 1"
+
+
+def test_parameters_are_replaced():
+    stmt = select(User.id).where(User.id == 1, User.email == "user@example.com")
+
+    assert normalize_statement(compile_sql(stmt)) == (
+        "SELECT users.id FROM users WHERE users.id = ?::INTEGER AND users.email = ?::VARCHAR"
+    )
+
+
+@pytest.mark.parametrize("size", [1, 2, 30])
+def test_parameter_lists_with_casts_are_collapsed(size):
+    stmt = select(User.id).where(
+        User.id.in_(list(range(size))),
+        User.email.in_(["user@example.com"] * size),
+        User.created_at.in_([None] * size),
+    )
+
+    assert normalize_statement(compile_sql(stmt)) == (
+        "SELECT users.id FROM users WHERE users.id IN (?) AND users.email IN (?) AND users.created_at IN (?)"
+    )
+
+
+def test_long_statements_are_truncated():
+    assert len(normalize_statement("SELECT " + ", ".join(f"column_{i}" for i in range(100)))) == 200
+
+
+def duration_count(engine_name: str, statement: str) -> float:
+    for metric in DB_STATEMENT_DURATION.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == {"engine": engine_name, "statement": statement}:
+                return sample.value
+    return 0.0
+
+
+def test_failed_statements_are_timed():
+    engine = create_engine("sqlite://")
+    instrument_engine(SimpleNamespace(sync_engine=engine), "test-failed")  # type: ignore[arg-type]
+    timing = RequestTiming(started=0.0)
+    token = request_timing_var.set(timing)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+    finally:
+        request_timing_var.reset(token)
+
+    assert duration_count("test-failed", "SELECT * FROM missing") == 1
+    assert timing.statements == 2
+    assert timing.statement_counts["SELECT * FROM missing"] == 1
+    assert timing.db_time > 0
+
+
+class RecordingSlowQueryLog(SlowQueryLog):
+    def __init__(self) -> None:
+        super().__init__(threshold=0.0)
+        self.slow: list[tuple[str, bool]] = []
+
+    def _on_slow_query(self, engine_name: str, statement: str, parameters: Any, elapsed: float, failed: bool) -> None:
+        self.slow.append((statement, failed))
+
+
+def test_failed_statements_reach_the_slow_query_log():
+    engine = create_engine("sqlite://")
+    slow_query_log = RecordingSlowQueryLog()
+    instrument_engine(SimpleNamespace(sync_engine=engine), "test-slow", slow_query_log)  # type: ignore[arg-type]
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+
+    assert slow_query_log.slow == [("SELECT 1", False), ("SELECT * FROM missing", True)]
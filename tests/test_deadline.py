@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import pytest
+
+from src.middlewares.deadline import DeadlineMiddleware
+from src.utils.deadline import deadline_var
+
+
+async def call(header: str | None) -> tuple[float, int]:
+    """Run a request through the middleware, return the timeout the handler got and the response status."""
+    timeouts: list[float] = []
+    sent: list[dict] = []
+
+    async def app(scope, receive, send) -> None:
+        timeouts.append(deadline_var.get() - time.monotonic())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive() -> dict:
+        if messages:
+            return messages.pop()
+        # Like a server, nothing more arrives until the client disconnects.
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    headers = [(b"x-request-timeout", header.encode())] if header is not None else []
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/users", "headers": headers}
+    middleware = DeadlineMiddleware(app, default_timeout=30.0, route_timeouts={}, min_timeout=0.5)
+    await middleware(scope, receive, send)
+    return timeouts[0], sent[0]["status"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [(None, 30.0), ("5", 5.0), ("60", 30.0), ("0", 0.5), ("-3", 0.5), ("nan", 30.0), ("inf", 30.0), ("soon", 30.0)],
+)
+async def test_request_timeout_header_is_clamped(header, expected):
+    timeout, status = await call(header)
+
+    assert timeout == pytest.approx(expected, abs=0.05)
+    assert status == 200
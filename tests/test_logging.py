@@ -0,0 +1,31 @@
+import io
+import logging
+
+from src.utils.logging import BoundedQueueHandler
+
+
+def make_record(level: int, message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+def test_records_are_written_by_the_listener():
+    stream = io.StringIO()
+    handler = BoundedQueueHandler(stream=stream, max_size=10)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+
+    handler.handle(make_record(logging.INFO, "hello"))
+    handler.close()
+
+    assert stream.getvalue() == "INFO hello\n"
+
+
+def test_drop_policy_only_drops_records_below_warning():
+    stream = io.StringIO()
+    handler = BoundedQueueHandler(stream=stream, max_size=1, policy="drop")
+    handler.listener.stop()
+
+    handler.handle(make_record(logging.INFO, "kept"))
+    handler.handle(make_record(logging.INFO, "dropped"))
+
+    assert handler.stats() == {"queued": 1, "dropped": 1}
+    handler.close()
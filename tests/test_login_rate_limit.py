@@ -0,0 +1,49 @@
+from fastapi import Request
+import pytest
+
+from src.dependecies import rate_limit
+from src.exceptions.app_exceptions import TooManyRequestsException
+from src.utils.rate_limit import InMemoryRateLimitBackend, RateLimiter, RateLimitRule
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RateLimiter(InMemoryRateLimitBackend(max_keys=100))
+    monkeypatch.setattr(rate_limit, "rate_limiter", limiter)
+    monkeypatch.setattr(rate_limit.settings, "LOGIN_RATE_LIMIT_ENABLED", True)
+    return limiter
+
+
+def make_request(body: bytes, content_type: str = "application/json") -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/login",
+        "headers": [(b"content-type", content_type.encode())],
+        "client": ("203.0.113.7", 50000),
+    }
+    return Request(scope, receive)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("body", "content_type"),
+    [(b"", "application/json"), (b"email=user@example.com", "text/plain"), (b"\xff", "application/json")],
+)
+async def test_body_that_is_not_json_skips_the_email_limit(limiter, body, content_type):
+    await rate_limit.login_rate_limit(make_request(body, content_type))
+
+    assert limiter.backend.stats()["size"] == 1
+
+
+@pytest.mark.asyncio
+async def test_email_over_the_limit_is_rejected(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limit, "LOGIN_PER_IP", RateLimitRule("login:ip", 1000, 60))
+    for _ in range(rate_limit.LOGIN_PER_EMAIL.limit):
+        await rate_limit.login_rate_limit(make_request(b'{"email": "User@Example.com "}'))
+
+    with pytest.raises(TooManyRequestsException):
+        await rate_limit.login_rate_limit(make_request(b'{"email": "user@example.com"}'))
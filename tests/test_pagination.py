@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    cursor = (datetime(2024, 5, 17, 12, 30, 45, 123456, tzinfo=timezone.utc), 42)
+
+    token = encode_cursor(cursor)
+
+    assert "=" not in token
+    assert decode_cursor(token) == cursor
+
+
+@pytest.mark.parametrize("token", ["", "not a cursor", "W10", "WyJub3QgYSBkYXRlIiwgMV0"])
+def test_invalid_cursor_raises_value_error(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(token)
@@ -0,0 +1,77 @@
+import pytest
+
+from src.utils import rate_limit
+from src.utils.rate_limit import InMemoryRateLimitBackend, RateLimiter, RateLimitRule
+
+
+RULE = RateLimitRule(name="login", limit=3, window=60)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [6000.0]  # start of window 100
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_hits_are_counted_in_the_current_window(clock):
+    backend = InMemoryRateLimitBackend(max_keys=10)
+
+    assert await backend.hit("key", 60) == (1, 0)
+    clock[0] += 30
+    assert await backend.hit("key", 60) == (2, 0)
+    assert await backend.hit("other", 60) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_current_window_rolls_over_into_previous(clock):
+    backend = InMemoryRateLimitBackend(max_keys=10)
+    await backend.hit("key", 60)
+    await backend.hit("key", 60)
+
+    clock[0] += 60
+    assert await backend.hit("key", 60) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_counters_older_than_the_previous_window_are_dropped(clock):
+    backend = InMemoryRateLimitBackend(max_keys=10)
+    await backend.hit("key", 60)
+
+    clock[0] += 120
+    assert await backend.hit("key", 60) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_over_limit_with_retry_after(clock):
+    limiter = RateLimiter(InMemoryRateLimitBackend(max_keys=10))
+    for _ in range(RULE.limit):
+        assert await limiter.check(RULE, "user@example.com") is None
+
+    clock[0] += 15
+    assert await limiter.check(RULE, "user@example.com") == pytest.approx(45)
+    assert await limiter.check(RULE, "other@example.com") is None
+    assert limiter.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_weights_previous_window_by_overlap(clock):
+    limiter = RateLimiter(InMemoryRateLimitBackend(max_keys=10))
+    for _ in range(RULE.limit):
+        await limiter.check(RULE, "value")
+
+    # Halfway into the next window 3 * 0.5 previous hits still count: one more is within the limit, two are not.
+    clock[0] += 90
+    assert await limiter.check(RULE, "value") is None
+    assert await limiter.check(RULE, "value") == pytest.approx(30)
+
+
+def test_key_is_bounded_and_does_not_contain_the_value():
+    key = RateLimiter.key(RULE, "a" * 1000 + "@example.com")
+
+    assert key.startswith("login:")
+    assert "example.com" not in key
+    assert len(key) <= 255
+    assert key == RateLimiter.key(RULE, "a" * 1000 + "@example.com")
+    assert key != RateLimiter.key(RULE, "b@example.com")
@@ -0,0 +1,99 @@
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.models.users import User
+from src.repositories.base import SQLModelRepository
+
+
+class FakeResult:
+    def __init__(self, rows: list[Any]) -> None:
+        self.rows = rows
+
+    def scalars(self) -> list[Any]:
+        return self.rows
+
+    def all(self) -> list[Any]:
+        return self.rows
+
+
+class FakeSession:
+    """Records executed statements instead of talking to a database."""
+
+    def __init__(self, rows: list[Any] | None = None) -> None:
+        self.info: dict[str, Any] = {}
+        self.rows = rows or []
+        self.executed: list[tuple[Any, Any]] = []
+        self.commits = 0
+
+    async def execute(self, stmt: Any, params: Any = None) -> FakeResult:
+        self.executed.append((stmt, params))
+        return FakeResult(self.rows)
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+class UserTestRepository(SQLModelRepository[User]):
+    model = User
+
+
+def compile_sql(stmt: Any) -> str:
+    return " ".join(str(stmt.compile(dialect=postgresql.asyncpg.dialect())).split())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["bulk_add", "bulk_update", "bulk_delete"])
+async def test_empty_bulk_operations_skip_the_database(method):
+    session = FakeSession()
+
+    await getattr(UserTestRepository(session), method)([])  # type: ignore[arg-type]
+
+    assert session.executed == []
+    assert session.commits == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_add_inserts_all_rows_in_one_statement():
+    session = FakeSession(rows=["first", "second"])
+    rows = [{"email": "a@example.com", "hashed_password": "x"}, {"email": "b@example.com", "hashed_password": "y"}]
+
+    entities = await UserTestRepository(session).bulk_add(rows)  # type: ignore[arg-type]
+
+    assert entities == ["first", "second"]
+    [(stmt, params)] = session.executed
+    assert compile_sql(stmt).startswith("INSERT INTO users")
+    assert "RETURNING" in compile_sql(stmt)
+    assert params == rows
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_joins_a_values_list():
+    session = FakeSession(rows=[(1,), (2,)])
+    rows = [{"id": 1, "first_name": "Ada"}, {"id": 2, "first_name": "Alan"}]
+
+    updated = await UserTestRepository(session).bulk_update(rows)  # type: ignore[arg-type]
+
+    assert updated == 2
+    [(stmt, params)] = session.executed
+    assert compile_sql(stmt) == (
+        "UPDATE users SET updated_at=now(), first_name=data.first_name "
+        "FROM (VALUES ($1::INTEGER, $2::VARCHAR), ($3::INTEGER, $4::VARCHAR)) AS data (id, first_name) "
+        "WHERE users.id = data.id RETURNING users.id"
+    )
+    assert params is None
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_binds_the_ids_as_one_array():
+    session = FakeSession(rows=[(1,), (2,), (3,)])
+
+    deleted = await UserTestRepository(session).bulk_delete([1, 2, 3])  # type: ignore[arg-type]
+
+    assert deleted == 3
+    [(stmt, params)] = session.executed
+    assert compile_sql(stmt) == "DELETE FROM users WHERE users.id = ANY ($1::INTEGER[]) RETURNING users.id"
+    assert params == {"entity_ids": [1, 2, 3]}
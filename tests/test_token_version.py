@@ -0,0 +1,63 @@
+import pytest
+
+from src.models import User
+from src.services.users import UserService
+from src.utils.jwt import JWTService
+
+
+class FakeUserRepository:
+    def __init__(self, user: User):
+        self.user = user
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        return self.user if user_id == self.user.id else None
+
+
+def make_service(user: User) -> UserService:
+    service = UserService.__new__(UserService)
+    service.user_repo = FakeUserRepository(user)
+    return service
+
+
+def make_user(token_version: int = 0, is_active: bool = True) -> User:
+    return User(
+        id=7,
+        email="user@example.com",
+        hashed_password="hash",
+        first_name="Jane",
+        last_name="Doe",
+        is_active=is_active,
+        token_version=token_version,
+    )
+
+
+@pytest.mark.asyncio
+async def test_tokens_carry_token_version():
+    service = make_service(make_user(token_version=3))
+    tokens = service._issue_tokens(service.user_repo.user)
+
+    assert JWTService.decode_token(tokens["access_token"])["tv"] == 3
+    assert JWTService.decode_token(tokens["refresh_token"])["tv"] == 3
+    assert (await service.get_user_by_token(tokens["access_token"])).id == 7
+    assert "access_token" in await service.refresh_tokens(tokens["refresh_token"])
+
+
+@pytest.mark.asyncio
+async def test_bumped_token_version_revokes_tokens():
+    user = make_user()
+    service = make_service(user)
+    tokens = service._issue_tokens(user)
+    user.token_version += 1
+
+    with pytest.raises(ValueError, match="revoked"):
+        await service.get_user_by_token(tokens["access_token"])
+    with pytest.raises(ValueError, match="revoked"):
+        await service.refresh_tokens(tokens["refresh_token"])
+
+
+def test_tokens_without_version_match_initial_version():
+    payload = {"sub": "7", "type": "access"}
+
+    assert not JWTService.is_revoked(payload, 0)
+    assert JWTService.is_revoked(payload, 1)
+    assert not JWTService.is_revoked({**payload, "tv": 1}, 1)
@@ -0,0 +1,103 @@
+import pytest
+
+from src.repositories import cache
+from src.repositories.cache import InMemoryUserCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def user(user_id: int = 1, email: str = "user@example.com", **values) -> dict:
+    return {"id": user_id, "email": email, "first_name": "Ada", **values}
+
+
+def test_fill_started_before_an_invalidation_is_dropped(clock):
+    user_cache = InMemoryUserCache(max_size=10, ttl=60)
+    generation = user_cache.generation()
+
+    user_cache.invalidate(user_id=1)
+    user_cache.set(user(first_name="Old"), generation)
+
+    assert user_cache.get_by_id(1) is None
+    assert user_cache.stats()["stale_fills"] == 1
+
+    user_cache.set(user(first_name="New"), user_cache.generation())
+    assert user_cache.get_by_id(1)["first_name"] == "New"
+
+
+def test_email_invalidation_drops_fills_by_email(clock):
+    user_cache = InMemoryUserCache(max_size=10, ttl=60)
+    generation = user_cache.generation()
+
+    user_cache.invalidate(emails=["user@example.com"])
+    user_cache.set(user(), generation)
+
+    assert user_cache.get_by_email("user@example.com") is None
+
+
+def test_invalidating_a_cached_user_also_blocks_its_email(clock):
+    user_cache = InMemoryUserCache(max_size=10, ttl=60)
+    user_cache.set(user())
+    generation = user_cache.generation()
+
+    user_cache.invalidate(user_id=1)
+    user_cache.set(user(user_id=2), generation)
+
+    assert user_cache.get_by_email("user@example.com") is None
+
+
+def test_other_users_are_still_filled(clock):
+    user_cache = InMemoryUserCache(max_size=10, ttl=60)
+    generation = user_cache.generation()
+
+    user_cache.invalidate(user_id=1, emails=["user@example.com"])
+    user_cache.set(user(user_id=2, email="other@example.com"), generation)
+
+    assert user_cache.get_by_id(2) is not None
+
+
+def test_fills_are_refused_during_the_invalidation_grace(clock):
+    user_cache = InMemoryUserCache(max_size=10, ttl=60, invalidation_grace=1.0)
+    user_cache.invalidate(user_id=1)
+
+    user_cache.set(user(), user_cache.generation())
+    assert user_cache.get_by_id(1) is None
+
+    clock[0] += 1.0
+    user_cache.set(user(), user_cache.generation())
+    assert user_cache.get_by_id(1) is not None
+
+
+def test_clear_refuses_fills_in_flight(clock):
+    user_cache = InMemoryUserCache(max_size=10, ttl=60)
+    generation = user_cache.generation()
+
+    user_cache.clear()
+    user_cache.set(user(), generation)
+
+    assert user_cache.get_by_id(1) is None
+
+
+def test_forgotten_invalidations_refuse_older_fills(clock):
+    user_cache = InMemoryUserCache(max_size=2, ttl=60)
+    generation = user_cache.generation()
+
+    user_cache.invalidate(user_id=1)
+    user_cache.invalidate(user_id=2)
+    user_cache.invalidate(user_id=3)
+    user_cache.set(user(user_id=1), generation)
+
+    assert user_cache.get_by_id(1) is None
+
+
+def test_fills_without_generation_are_always_stored(clock):
+    user_cache = InMemoryUserCache(max_size=10, ttl=60, invalidation_grace=1.0)
+    user_cache.invalidate(user_id=1)
+
+    user_cache.set(user())
+
+    assert user_cache.get_by_id(1) is not None
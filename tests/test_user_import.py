@@ -0,0 +1,57 @@
+from typing import AsyncIterator
+
+import pytest
+
+from src.services.user_import import UserImportService, _iter_lines
+
+
+async def stream(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(iterator: AsyncIterator) -> list:
+    return [item async for item in iterator]
+
+
+@pytest.mark.asyncio
+async def test_lines_are_split_across_chunks():
+    lines = await collect(_iter_lines(stream(b"first\nsec", b"ond\n", b"third"), max_line_bytes=10))
+
+    assert lines == [b"first", b"second", b"third"]
+
+
+@pytest.mark.asyncio
+async def test_oversized_lines_are_reported_once_and_dropped():
+    chunks = stream(b"ok\n" + b"x" * 8, b"x" * 8, b"x" * 8 + b"\nnext\n", b"y" * 20)
+
+    lines = await collect(_iter_lines(chunks, max_line_bytes=10))
+
+    assert lines == [b"ok", None, b"next", None]
+
+
+async def parse(import_format: str, *chunks: bytes) -> list:
+    service = UserImportService(database=None, max_line_bytes=64)  # type: ignore[arg-type]
+    return await collect(service._parse(stream(*chunks), import_format))  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_rows_that_are_not_objects_are_reported():
+    rows = await parse("ndjson", b'{"email": "a@example.com"}\n\nnot json\n[1, 2]\n\xff\n')
+
+    assert rows == [
+        (1, {"email": "a@example.com"}, None),
+        (2, {}, "Row is not a valid JSON object"),
+        (3, {}, "Row is not a valid JSON object"),
+        (4, {}, "Row is not valid UTF-8"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_are_mapped_to_the_header():
+    rows = await parse("csv", b"email, full_name\na@example.com,Ada Lovelace\n", b"z" * 100 + b"\n")
+
+    assert rows == [
+        (1, {"email": "a@example.com", "full_name": "Ada Lovelace"}, None),
+        (2, {}, "Row is longer than 64 bytes"),
+    ]